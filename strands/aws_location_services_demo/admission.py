@@ -0,0 +1,83 @@
+"""Admission control for agent queries in the web app.
+
+An agent query holds a worker thread for as long as the agent runs, often tens of
+seconds. AdmissionController counts the queries in flight, running or waiting for
+a pooled agent, and turns new ones away at once instead of letting them pile up:
+
+- 429 when the user already has max_per_user queries in flight
+- 503 when max_in_flight queries are in flight overall, that is every pooled agent
+  is busy and the wait queue in front of the pool is full
+
+Rejections carry a Retry-After hint and are counted for /status.
+"""
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+
+class Rejected(Exception):
+    """A query turned away before it reached an agent."""
+
+    def __init__(self, status: int, message: str, retry_after: int):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounds the queries in flight, overall and per user."""
+
+    def __init__(self, max_in_flight: int, max_per_user: int = 2, retry_after: int = 5):
+        self.max_in_flight = max_in_flight
+        self.max_per_user = max_per_user
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._per_user = Counter()
+        self.admitted = 0
+        self.rejected_user = 0
+        self.rejected_busy = 0
+
+    @contextmanager
+    def admit(self, user_id):
+        """Hold a place for one query of user_id; raises Rejected if there is none."""
+        with self._lock:
+            if self._per_user[user_id] >= self.max_per_user:
+                self.rejected_user += 1
+                raise Rejected(
+                    429,
+                    f'You already have {self.max_per_user} queries in progress. '
+                    'Please wait for them to finish.',
+                    self.retry_after,
+                )
+            if self._in_flight >= self.max_in_flight:
+                self.rejected_busy += 1
+                raise Rejected(
+                    503,
+                    'TravelGuide is busy with other queries. Please try again in a few moments.',
+                    self.retry_after,
+                )
+            self._in_flight += 1
+            self._per_user[user_id] += 1
+            self.admitted += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._per_user[user_id] -= 1
+                if not self._per_user[user_id]:
+                    del self._per_user[user_id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'in_flight': self._in_flight,
+                'max_in_flight': self.max_in_flight,
+                'max_per_user': self.max_per_user,
+                'users_in_flight': len(self._per_user),
+                'admitted': self.admitted,
+                'rejected_user': self.rejected_user,
+                'rejected_busy': self.rejected_busy,
+            }
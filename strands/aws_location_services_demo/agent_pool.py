@@ -0,0 +1,160 @@
+"""Pool of ready agents, each with its own open MCP session, for the web app.
+
+Opening an SSE session to the MCP server, listing its tools and building an Agent
+around the system prompt all happen before the model is called. The pool does that
+work ahead of time: a request borrows an agent, runs its query and gives the agent
+back, and the agent's conversation is reset so the next request starts from the
+system prompt alone.
+
+An agent whose run raised is closed rather than returned, and a fresh one is built
+in its place on the next borrow, as are agents older than max_age (so a restarted
+MCP server is picked up). Build and borrow times are kept to report the setup time
+saved per request.
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from strands.agent.state import AgentState
+from strands.telemetry.metrics import EventLoopMetrics
+
+
+class PoolExhausted(Exception):
+    """No agent became free within the borrow timeout."""
+
+
+class PooledAgent:
+    """An Agent together with the MCP client session its tools call through."""
+
+    def __init__(self, mcp_client, agent):
+        self.mcp_client = mcp_client
+        self.agent = agent
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+    def reset(self):
+        """Drop the conversation and run metrics so the next query starts from the system prompt."""
+        self.agent.messages.clear()
+        self.agent.state = AgentState()
+        self.agent.event_loop_metrics = EventLoopMetrics()
+        self.agent.conversation_manager.removed_message_count = 0
+
+    def close(self):
+        try:
+            self.mcp_client.stop(None, None, None)
+        except Exception as e:
+            print(f"Error closing pooled MCP session: {e}")
+
+
+class AgentPool:
+    """A fixed number of agents that requests borrow and return."""
+
+    def __init__(self, build, size: int = 4, timeout: float = 30.0, max_age: float = 900.0):
+        """Initialize an empty pool; build() returns a new (mcp_client, agent) pair."""
+        self.build = build
+        self.size = size
+        self.timeout = timeout
+        self.max_age = max_age
+        # None marks a slot whose agent has to be built on its next borrow
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(None)
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.build_seconds = 0.0
+        self.borrows = 0
+        self.borrow_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.discarded = 0
+
+    def _build(self) -> PooledAgent:
+        start = time.perf_counter()
+        mcp_client, agent = self.build()
+        with self._lock:
+            self.builds += 1
+            self.build_seconds += time.perf_counter() - start
+        return PooledAgent(mcp_client, agent)
+
+    def fill(self):
+        """Build every agent that is not built yet, so no request pays for it."""
+        slots = []
+        while True:
+            try:
+                slots.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            for index, pooled in enumerate(slots):
+                if pooled is None:
+                    slots[index] = self._build()
+        finally:
+            for pooled in slots:
+                self._idle.put(pooled)
+
+    @contextmanager
+    def agent(self):
+        """Borrow an agent for one query; raises PoolExhausted if none frees up in time."""
+        start = time.perf_counter()
+        try:
+            pooled = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolExhausted(f'no agent free after {self.timeout:g} seconds') from None
+        waited = time.perf_counter() - start
+        try:
+            if pooled is not None and time.monotonic() - pooled.created_at > self.max_age:
+                pooled.close()
+                pooled = None
+            if pooled is None:
+                pooled = self._build()
+        except BaseException:
+            self._idle.put(None)
+            raise
+        with self._lock:
+            self.borrows += 1
+            self.wait_seconds += waited
+            self.borrow_seconds += time.perf_counter() - start - waited
+        try:
+            yield pooled.agent
+        except BaseException:
+            pooled.close()
+            with self._lock:
+                self.discarded += 1
+            self._idle.put(None)
+            raise
+        pooled.uses += 1
+        pooled.reset()
+        self._idle.put(pooled)
+
+    def close(self):
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if pooled is not None:
+                pooled.close()
+
+    def stats(self) -> dict:
+        """Mean build and borrow times; their difference is the setup time saved per request.
+
+        Time spent waiting for a busy pool is reported apart, as mean_wait_ms.
+        """
+        with self._lock:
+            build_ms = 1000 * self.build_seconds / self.builds if self.builds else None
+            borrow_ms = 1000 * self.borrow_seconds / self.borrows if self.borrows else None
+            return {
+                'size': self.size,
+                'idle': self._idle.qsize(),
+                'builds': self.builds,
+                'borrows': self.borrows,
+                'discarded': self.discarded,
+                'mean_build_ms': round(build_ms, 1) if build_ms is not None else None,
+                'mean_borrow_ms': round(borrow_ms, 1) if borrow_ms is not None else None,
+                'mean_wait_ms': round(1000 * self.wait_seconds / self.borrows, 1)
+                if self.borrows
+                else None,
+                'saved_ms_per_request': round(build_ms - borrow_ms, 1)
+                if build_ms is not None and borrow_ms is not None
+                else None,
+            }
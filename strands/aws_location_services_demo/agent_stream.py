@@ -0,0 +1,95 @@
+"""Agent runs as a stream of progress events for the web app.
+
+progress() turns Agent.stream_async() into a synchronous generator, so a Flask
+response can forward the events while the agent is still running, and reduces
+the Strands events to the few the page shows:
+
+- text: a piece of the model's answer, as the model streams it
+- tool: a tool call starting, then finishing with status success or error
+- result: the AgentResult, last
+
+sse() formats one event as a server-sent event frame.
+"""
+
+import asyncio
+import json
+import queue
+import threading
+from contextlib import closing
+
+
+_DONE = object()
+
+
+def _run_stream(agent, query):
+    """Iterate agent.stream_async(query), run as one task on an event loop in its own thread.
+
+    The whole run stays in one task so the context variables tracing relies on hold
+    from start to end. Closing the generator early cancels the run.
+    """
+    events = queue.Queue()
+    loop = asyncio.new_event_loop()
+
+    async def forward():
+        async for event in agent.stream_async(query):
+            events.put(event)
+
+    task = loop.create_task(forward())
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+            events.put(_DONE)
+        except BaseException as e:
+            events.put(e)
+        finally:
+            loop.close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            event = events.get()
+            if event is _DONE:
+                return
+            if isinstance(event, BaseException):
+                raise event
+            yield event
+    finally:
+        if thread.is_alive():
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass
+        thread.join()
+
+
+def progress(agent, query):
+    """Yield (event, data) pairs for one agent run, ending with ('result', AgentResult)."""
+    tool_names = {}
+    with closing(_run_stream(agent, query)) as events:
+        for event in events:
+            if 'data' in event:
+                yield 'text', {'text': event['data']}
+            elif 'current_tool_use' in event:
+                tool_use = event['current_tool_use']
+                tool_id = tool_use.get('toolUseId')
+                if tool_id and tool_id not in tool_names:
+                    tool_names[tool_id] = tool_use.get('name')
+                    yield 'tool', {'id': tool_id, 'name': tool_names[tool_id], 'status': 'running'}
+            elif 'message' in event:
+                for content in event['message'].get('content', ()):
+                    tool_result = content.get('toolResult')
+                    if tool_result:
+                        tool_id = tool_result.get('toolUseId')
+                        yield 'tool', {
+                            'id': tool_id,
+                            'name': tool_names.get(tool_id),
+                            'status': tool_result.get('status', 'success'),
+                        }
+            elif 'result' in event:
+                yield 'result', event['result']
+
+
+def sse(event: str, data) -> str:
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
@@ -0,0 +1,76 @@
+"""Concurrency benchmark for the Amazon Location MCP server against a stubbed AWS service.
+
+Every geo-places/geo-routes call is answered by the offline stub in geo_stub.py,
+which sleeps for a fixed latency, then many sessions call the same tool at once through in-memory MCP
+clients. If AWS calls block the event loop the wall time grows linearly with
+the number of sessions; when they run on the AWS executor they overlap.
+
+Usage:
+    python benchmarks/concurrency_benchmark.py --sessions 32 --latency-ms 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server  # noqa: E402
+from geo_stub import StubGeoClient  # noqa: E402
+from fastmcp import Client  # noqa: E402
+
+
+TOOL_ARGUMENTS = {
+    'reverse_geocode': {'longitude': -122.3321, 'latitude': 47.6062},
+    'search_nearby': {'longitude': -122.3321, 'latitude': 47.6062, 'query': 'coffee_shop'},
+    'calculate_route': {
+        'departure_position': [-122.3321, 47.6062],
+        'destination_position': [-122.3465, 47.6171],
+    },
+}
+
+
+def install_stub(latency_ms):
+    for service in ('geo-places', 'geo-routes'):
+        server.client_registry.register(service, StubGeoClient(service, latency_ms=latency_ms))
+
+
+async def run_tool(tool, sessions):
+    clients = [Client(server.mcp) for _ in range(sessions)]
+    for client in clients:
+        await client.__aenter__()
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(client.call_tool(tool, TOOL_ARGUMENTS[tool]) for client in clients)
+        )
+        return time.perf_counter() - start
+    finally:
+        for client in clients:
+            await client.__aexit__(None, None, None)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=32)
+    parser.add_argument('--latency-ms', type=float, default=200.0)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    install_stub(args.latency_ms)
+    print(
+        f'{args.sessions} concurrent sessions, {args.latency_ms:.0f} ms stub latency, '
+        f'{server.AWS_EXECUTOR_WORKERS} AWS executor workers'
+    )
+    print(f'{"tool":<18}{"wall (s)":>10}{"serial (s)":>12}{"overlap":>10}')
+    for tool in TOOL_ARGUMENTS:
+        wall = await run_tool(tool, args.sessions)
+        serial = args.sessions * latency
+        print(f'{tool:<18}{wall:>10.2f}{serial:>12.2f}{serial / wall:>9.1f}x')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
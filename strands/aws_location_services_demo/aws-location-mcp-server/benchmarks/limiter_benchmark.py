@@ -0,0 +1,138 @@
+"""How the adaptive concurrency limit in throttle.py settles against the offline stub.
+
+--callers tasks call search_nearby on a StubGeoClient in a loop for --duration
+seconds, each call through one AdaptiveLimiter as server.py does. Three services
+are simulated:
+
+- jitter: latency spread by +/- --jitter-ms and no throttling, so the limit should
+  hold at its initial value or grow, never shrink
+- saturated: latency grows with every call in flight beyond --capacity, as on a
+  service queueing requests, so the limit should come down to about where the
+  latency doubles, twice --capacity
+- quota: calls over --max-tps per second are throttled, so the limit should
+  settle where throttles are rare
+
+The limit is printed once a second, followed by its low, mean and final values.
+
+Usage:
+    python benchmarks/limiter_benchmark.py --duration 20 --latency-ms 60 --jitter-ms 40
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import botocore.exceptions  # noqa: E402
+from geo_stub import StubGeoClient  # noqa: E402
+from throttle import AdaptiveLimiter  # noqa: E402
+
+
+SCENARIOS = ('jitter', 'saturated', 'quota')
+SEATTLE = [-122.3321, 47.6062]
+
+
+class SaturatedStub(StubGeoClient):
+    """Stub whose latency grows with each call in flight beyond its capacity."""
+
+    def __init__(self, capacity, **settings):
+        """Initialize the stub with room for capacity calls at its base latency."""
+        super().__init__('geo-places', **settings)
+        self.capacity = capacity
+        self.in_flight = 0
+
+    def _begin(self, operation):
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+            self.in_flight += 1
+            excess = max(0, self.in_flight - self.capacity)
+        latency = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(0.0, latency) * (1 + excess / self.capacity) / 1000)
+        with self._lock:
+            self.in_flight -= 1
+
+
+def make_stub(scenario, args):
+    settings = {'latency_ms': args.latency_ms, 'jitter_ms': args.jitter_ms}
+    if scenario == 'saturated':
+        return SaturatedStub(args.capacity, **settings)
+    if scenario == 'quota':
+        settings['max_tps'] = args.max_tps
+    return StubGeoClient('geo-places', **settings)
+
+
+async def caller(limiter, stub, executor, deadline, counts):
+    loop = asyncio.get_running_loop()
+    while time.monotonic() < deadline:
+        try:
+            started_at = await limiter.acquire(time.monotonic() + 10.0, 'SearchNearby')
+        except botocore.exceptions.ClientError:
+            counts['rejected'] += 1
+            continue
+        throttled = False
+        try:
+            await loop.run_in_executor(
+                executor, lambda: stub.search_nearby(QueryPosition=SEATTLE, MaxResults=5)
+            )
+            counts['calls'] += 1
+        except botocore.exceptions.ClientError:
+            throttled = True
+            counts['throttled'] += 1
+            await asyncio.sleep(0.05)
+        finally:
+            limiter.release(started_at, throttled)
+
+
+async def run_scenario(scenario, args):
+    stub = make_stub(scenario, args)
+    limiter = AdaptiveLimiter(scenario, initial_limit=args.initial_limit, max_limit=args.callers)
+    counts = {'calls': 0, 'throttled': 0, 'rejected': 0}
+    limits = []
+    deadline = time.monotonic() + args.duration
+    with ThreadPoolExecutor(max_workers=args.callers) as executor:
+        tasks = [
+            asyncio.ensure_future(caller(limiter, stub, executor, deadline, counts))
+            for _ in range(args.callers)
+        ]
+        while time.monotonic() < deadline:
+            await asyncio.sleep(1.0)
+            limits.append(limiter.limit)
+        await asyncio.gather(*tasks)
+    print(f'{scenario:<10}' + ' '.join(f'{limit:.1f}' for limit in limits))
+    return (
+        f'{scenario:<10}{min(limits):>8.1f}{sum(limits) / len(limits):>8.1f}{limiter.limit:>8.1f}'
+        f'{counts["calls"] / args.duration:>9.1f}{counts["throttled"]:>10}'
+        f'{1000 * limiter.mean_latency:>10.1f}'
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenario', choices=SCENARIOS, action='append')
+    parser.add_argument('--callers', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--initial-limit', type=float, default=8.0)
+    parser.add_argument('--latency-ms', type=float, default=60.0)
+    parser.add_argument('--jitter-ms', type=float, default=40.0)
+    parser.add_argument('--capacity', type=int, default=12)
+    parser.add_argument('--max-tps', type=float, default=100.0)
+    args = parser.parse_args()
+
+    print(
+        f'{args.callers} callers for {args.duration:.0f} s, stub latency '
+        f'{args.latency_ms:.0f}+/-{args.jitter_ms:.0f} ms, initial limit {args.initial_limit:g}'
+    )
+    print('limit each second:')
+    rows = [await run_scenario(scenario, args) for scenario in args.scenario or SCENARIOS]
+    print(f'{"scenario":<10}{"low":>8}{"mean":>8}{"final":>8}{"calls/s":>9}{"throttled":>10}{"mean ms":>10}')
+    print('\n'.join(rows))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
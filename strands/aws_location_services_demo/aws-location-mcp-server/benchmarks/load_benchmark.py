@@ -0,0 +1,164 @@
+"""Load benchmark for the Amazon Location MCP server over SSE, backed by the offline stub.
+
+Starts server.py with GEO_STUB=1 on a local port (or targets --url), then runs
+--concurrency MCP sessions that call reverse_geocode, search_nearby and
+calculate_route in a loop for --duration seconds. Positions are drawn at random
+within --spread-km of downtown Seattle, so a small spread mostly measures the
+caches and a large one mostly measures the AWS call path. Reports throughput
+and p50/p95/p99 latency per tool.
+
+Usage:
+    python benchmarks/load_benchmark.py --concurrency 32 --duration 20 --latency-ms 80
+    python benchmarks/load_benchmark.py --throttle-rate 0.05 --spread-km 50
+    python benchmarks/load_benchmark.py --url http://localhost:8000/sse
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+import numpy as np
+from fastmcp import Client
+from fastmcp.client.transports import SSETransport
+
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEATTLE = (-122.3321, 47.6062)
+TOOLS = ('reverse_geocode', 'search_nearby', 'calculate_route')
+CATEGORIES = ('coffee_shop', 'restaurant', 'gas_station', 'hotel', 'pharmacy')
+
+
+def random_position(rng, spread_km):
+    """A [longitude, latitude] point uniformly spread around downtown Seattle."""
+    dlat = rng.uniform(-spread_km, spread_km) / 110.54
+    dlon = rng.uniform(-spread_km, spread_km) / (111.32 * math.cos(math.radians(SEATTLE[1])))
+    return [round(SEATTLE[0] + dlon, 6), round(SEATTLE[1] + dlat, 6)]
+
+
+def tool_arguments(tool, rng, spread_km):
+    longitude, latitude = random_position(rng, spread_km)
+    if tool == 'reverse_geocode':
+        return {'longitude': longitude, 'latitude': latitude}
+    if tool == 'search_nearby':
+        return {'longitude': longitude, 'latitude': latitude, 'query': rng.choice(CATEGORIES)}
+    return {
+        'departure_position': [longitude, latitude],
+        'destination_position': random_position(rng, spread_km),
+    }
+
+
+def start_server(port, args):
+    env = dict(
+        os.environ,
+        GEO_STUB='1',
+        GEO_STUB_LATENCY_MS=str(args.latency_ms),
+        GEO_STUB_JITTER_MS=str(args.jitter_ms),
+        GEO_STUB_THROTTLE_RATE=str(args.throttle_rate),
+        GEO_STUB_MAX_TPS=str(args.max_tps),
+    )
+    return subprocess.Popen(
+        [
+            sys.executable,
+            '-c',
+            f"import server; server.mcp.run(transport='sse', host='127.0.0.1', port={port})",
+        ],
+        cwd=SERVER_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_until_ready(url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with Client(SSETransport(url)) as client:
+                await client.list_tools()
+                return
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+async def worker(url, seed, deadline, spread_km, samples):
+    """Call the tools round robin until the deadline, appending (tool, seconds, ok)."""
+    rng = random.Random(seed)
+    async with Client(SSETransport(url)) as client:
+        index = seed
+        while time.monotonic() < deadline:
+            tool = TOOLS[index % len(TOOLS)]
+            index += 1
+            start = time.perf_counter()
+            try:
+                result = await client.call_tool(
+                    tool, tool_arguments(tool, rng, spread_km), raise_on_error=False
+                )
+                ok = not result.is_error and 'error' not in (result.structured_content or {})
+            except Exception:
+                ok = False
+            samples.append((tool, time.perf_counter() - start, ok))
+
+
+def report(samples, elapsed):
+    print(f'{"tool":<18}{"calls":>8}{"errors":>8}{"req/s":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"max ms":>9}')
+    for tool in TOOLS + ('all',):
+        selected = [sample for sample in samples if tool in ('all', sample[0])]
+        if not selected:
+            continue
+        latencies = np.array([seconds for _, seconds, _ in selected]) * 1000
+        errors = sum(1 for _, _, ok in selected if not ok)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(
+            f'{tool:<18}{len(selected):>8}{errors:>8}{len(selected) / elapsed:>9.1f}'
+            f'{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}{latencies.max():>9.1f}'
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='SSE endpoint of a running server, skips starting one')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--spread-km', type=float, default=5.0)
+    parser.add_argument('--latency-ms', type=float, default=80.0)
+    parser.add_argument('--jitter-ms', type=float, default=20.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--max-tps', type=float, default=0.0)
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        url = f'http://127.0.0.1:{args.port}/sse'
+        process = start_server(args.port, args)
+    try:
+        await wait_until_ready(url)
+        print(
+            f'{args.concurrency} sessions for {args.duration:.0f} s against {url}'
+            + ('' if args.url else f', stub latency {args.latency_ms:.0f}+/-{args.jitter_ms:.0f} ms')
+        )
+        samples = []
+        start = time.monotonic()
+        deadline = start + args.duration
+        await asyncio.gather(
+            *(
+                worker(url, seed, deadline, args.spread_km, samples)
+                for seed in range(args.concurrency)
+            )
+        )
+        report(samples, time.monotonic() - start)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""Micro-benchmark of FlexiblePolyline decoding and route simplification.
+
+Builds a synthetic cross-country route (Seattle to Miami, winding like a real road),
+encodes it, then compares the pure Python decoder with the NumPy one and shows how
+far simplification shrinks the geometry at a few tolerances.
+
+Usage:
+    python benchmarks/polyline_benchmark.py --points 200000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import polyline  # noqa: E402
+import route_geometry  # noqa: E402
+
+
+SEATTLE = (47.6062, -122.3321)
+MIAMI = (25.7617, -80.1918)
+
+
+def synthetic_route(points):
+    """A winding route between Seattle and Miami with the given number of points."""
+    t = np.linspace(0.0, 1.0, points)
+    latitudes = SEATTLE[0] + (MIAMI[0] - SEATTLE[0]) * t + 0.5 * np.sin(t * 23.0)
+    longitudes = SEATTLE[1] + (MIAMI[1] - SEATTLE[1]) * t + 0.01 * np.sin(t * 4001.0)
+    return np.column_stack((latitudes, longitudes))
+
+
+def best_of(function, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    encoded = polyline.encode(synthetic_route(args.points).tolist())
+    decoded = polyline.decode_array(encoded)
+    assert np.allclose(decoded, polyline.decode(encoded))
+    length_km = route_geometry.cumulative_distances(decoded)[-1] / 1000
+    print(f'{args.points} points, {length_km:.0f} km, {len(encoded)} encoded characters')
+
+    pure = best_of(lambda: polyline.decode(encoded), args.repeat)
+    vectorized = best_of(lambda: polyline.decode_array(encoded), args.repeat)
+    print(f'{"decoder":<16}{"time (ms)":>12}')
+    print(f'{"pure Python":<16}{pure * 1000:>12.1f}')
+    print(f'{"NumPy":<16}{vectorized * 1000:>12.1f}   {pure / vectorized:.1f}x faster')
+
+    print(f'\n{"tolerance (m)":<16}{"points":>10}{"time (ms)":>12}')
+    for tolerance in (10, 50, 100, 500, 1000):
+        elapsed = best_of(lambda: route_geometry.simplify(decoded, tolerance), args.repeat)
+        kept = len(route_geometry.simplify(decoded, tolerance))
+        print(f'{tolerance:<16}{kept:>10}{elapsed * 1000:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
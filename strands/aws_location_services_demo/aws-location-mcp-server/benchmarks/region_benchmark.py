@@ -0,0 +1,135 @@
+"""Multi-region hedging benchmark for the Amazon Location MCP server, on per-region stubs.
+
+Each scenario runs the server in a fresh process with GEO_STUB=1 and its own
+AWS_REGIONS and per-region stub settings, then makes --calls reverse_geocode calls
+at distinct points (so every call misses the cache) from --concurrency tasks over
+an in-memory MCP session. Reports errors, p50/p95/p99 latency and the per-region
+calls, hedges and the region ranked first at the end.
+
+Scenarios:
+- single: one region that is slow
+- hedged: the same slow region listed first, with a fast second region
+- failover: two fast regions, the first one throttling a share of the calls
+
+Usage:
+    python benchmarks/region_benchmark.py --calls 300 --slow-ms 400 --fast-ms 60
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEATTLE = (-122.3321, 47.6062)
+
+
+def scenarios(args):
+    slow, fast = args.slow_ms, args.fast_ms
+    return {
+        'single': {'AWS_REGIONS': 'us-east-1', 'GEO_STUB_LATENCY_MS': str(slow)},
+        'hedged': {
+            'AWS_REGIONS': 'us-east-1,us-west-2',
+            'GEO_STUB_REGION_LATENCY_MS': f'us-east-1={slow},us-west-2={fast}',
+        },
+        'failover': {
+            'AWS_REGIONS': 'us-east-1,us-west-2',
+            'GEO_STUB_LATENCY_MS': str(fast),
+            'GEO_STUB_REGION_THROTTLE_RATE': f'us-east-1={args.throttle_rate}',
+        },
+    }
+
+
+async def worker(calls, concurrency):
+    """Run inside the scenario's process, print the results as one JSON line."""
+    sys.path.insert(0, SERVER_DIR)
+    import server
+    from fastmcp import Client
+
+    latencies = []
+    errors = 0
+    next_call = iter(range(calls))
+
+    async def session_loop(client):
+        nonlocal errors
+        for index in next_call:
+            # About 200 m apart, a different reverse geocode cache cell every call
+            arguments = {'longitude': SEATTLE[0] + 0.002 * index, 'latitude': SEATTLE[1]}
+            start = time.perf_counter()
+            result = await client.call_tool('reverse_geocode', arguments, raise_on_error=False)
+            latencies.append(time.perf_counter() - start)
+            errors += bool(result.is_error or 'error' in (result.structured_content or {}))
+
+    async with Client(server.mcp) as client:
+        await asyncio.gather(*(session_loop(client) for _ in range(concurrency)))
+    print(
+        json.dumps(
+            {
+                'latencies': latencies,
+                'errors': errors,
+                'regions': server.region_router.stats(),
+                'primary': server.region_router.ranked()[0],
+            }
+        )
+    )
+
+
+def run_scenario(settings, args):
+    env = dict(
+        os.environ,
+        GEO_STUB='1',
+        GEO_STUB_JITTER_MS=str(args.jitter_ms),
+        FASTMCP_LOG_LEVEL='ERROR',
+        **settings,
+    )
+    output = subprocess.run(
+        [sys.executable, __file__, '--worker', '--calls', str(args.calls),
+         '--concurrency', str(args.concurrency)],
+        cwd=SERVER_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--slow-ms', type=float, default=400)
+    parser.add_argument('--fast-ms', type=float, default=60)
+    parser.add_argument('--jitter-ms', type=float, default=20)
+    parser.add_argument('--throttle-rate', type=float, default=0.3)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        asyncio.run(worker(args.calls, args.concurrency))
+        return
+
+    print(f'{args.calls} reverse_geocode calls, {args.concurrency} concurrent')
+    print(
+        f'{"scenario":<10}{"errors":>7}{"p50 ms":>8}{"p95 ms":>8}{"p99 ms":>8}  '
+        f'{"primary":<11}region calls/hedges sent/won'
+    )
+    for name, settings in scenarios(args).items():
+        result = run_scenario(settings, args)
+        p50, p95, p99 = 1000 * np.percentile(result['latencies'], [50, 95, 99])
+        regions = ', '.join(
+            f'{region} {stats["calls"]}/{stats["hedges_sent"]}/{stats["hedges_won"]}'
+            for region, stats in result['regions'].items()
+        )
+        print(
+            f'{name:<10}{result["errors"]:>7}{p50:>8.0f}{p95:>8.0f}{p99:>8.0f}  '
+            f'{result["primary"]:<11}{regions}'
+        )
+
+
+if __name__ == '__main__':
+    main()
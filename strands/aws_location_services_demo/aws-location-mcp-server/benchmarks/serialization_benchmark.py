@@ -0,0 +1,90 @@
+"""CPU cost of turning a 50-result geo-places response into a tool result.
+
+Once the AWS response is in, a place search tool caches the details of the
+places that came with contacts, builds the result dict from the raw items, and
+FastMCP then serializes that dict twice: to JSON text for the text content and to
+plain Python for the structured content. This benchmark times those steps on the
+synthetic search_nearby fixture, with the 12 places repeated to 50 results, for the
+default fields and for all fields.
+
+Usage:
+    python benchmarks/serialization_benchmark.py --iterations 1000
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+import pydantic_core
+from fastmcp.tools.tool import default_serializer
+
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+import server  # noqa: E402
+
+
+RESULTS = 50
+ORIGIN = (-122.3321, 47.6062)
+
+
+def load_items():
+    path = os.path.join(SERVER_DIR, 'fixtures', 'geo_places_search_nearby.json')
+    with open(path) as f:
+        recorded = json.load(f)['ResultItems']
+    items = []
+    for index in range(RESULTS):
+        item = copy.deepcopy(recorded[index % len(recorded)])
+        item['PlaceId'] = f'{item["PlaceId"]}-{index}'
+        items.append(item)
+    return items
+
+
+def cpu_per_call(function, iterations, repeats=5):
+    """Best of repeats of the mean CPU time per call, to keep other load out of it."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.process_time()
+        for _ in range(iterations):
+            function()
+        best = min(best, (time.process_time() - start) / iterations)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=1000)
+    args = parser.parse_args()
+
+    items = load_items()
+    serializer = server.mcp._tool_serializer or default_serializer
+    print(f'{RESULTS} results, CPU per response in microseconds')
+    print(
+        f'{"fields":<10}{"cache":>8}{"extract":>10}{"text":>8}{"structured":>12}{"total":>8}'
+        f'{"bytes":>8}'
+    )
+    warm_seconds = cpu_per_call(lambda: server._warm_place_details(items), args.iterations)
+    for label, fields in (('default', server.DEFAULT_PLACE_FIELDS), ('all', server.PLACE_FIELDS)):
+
+        def extract():
+            return {'places': server._summarize_nearby_items(items, 'summary', fields, ORIGIN)}
+
+        result = extract()
+        extract_seconds = cpu_per_call(extract, args.iterations)
+        text_seconds = cpu_per_call(lambda: serializer(result), args.iterations)
+        structured_seconds = cpu_per_call(
+            lambda: pydantic_core.to_jsonable_python(result), args.iterations
+        )
+        total = warm_seconds + extract_seconds + text_seconds + structured_seconds
+        print(
+            f'{label:<10}{1e6 * warm_seconds:>8.0f}{1e6 * extract_seconds:>10.0f}'
+            f'{1e6 * text_seconds:>8.0f}{1e6 * structured_seconds:>12.0f}{1e6 * total:>8.0f}'
+            f'{len(serializer(result)):>8}'
+        )
+
+
+if __name__ == '__main__':
+    main()
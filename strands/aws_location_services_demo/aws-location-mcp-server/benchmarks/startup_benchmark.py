@@ -0,0 +1,91 @@
+"""Cold start benchmark for the Amazon Location MCP server over stdio.
+
+Agents spawn the server once per session, so its start-up time is paid on every
+launch. Each run starts a fresh `python server.py` process and measures:
+
+- import: `python -c "import server"` wall time, interpreter start included
+- ready: from spawning the process to the first list_tools response
+- clients: building the geo-places and geo-routes boto3 clients, which happens
+  on the first tool call rather than at start-up
+
+Nothing here calls AWS, so no credentials are needed.
+
+Usage:
+    python benchmarks/startup_benchmark.py --runs 5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from fastmcp import Client
+from fastmcp.client.transports import PythonStdioTransport
+
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_ENV = dict(
+    os.environ,
+    AWS_REGION=os.environ.get('AWS_REGION', 'us-east-1'),
+    FASTMCP_LOG_LEVEL='ERROR',
+)
+TIME_CLIENTS = """
+import time
+import server
+start = time.perf_counter()
+server.client_registry.client('geo-places')
+server.client_registry.client('geo-routes')
+print(time.perf_counter() - start)
+"""
+
+
+def time_import():
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, '-c', 'import server'], cwd=SERVER_DIR, env=SERVER_ENV, check=True
+    )
+    return time.perf_counter() - start
+
+
+def time_clients():
+    output = subprocess.run(
+        [sys.executable, '-c', TIME_CLIENTS],
+        cwd=SERVER_DIR,
+        env=SERVER_ENV,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(output.split()[-1])
+
+
+async def time_ready():
+    transport = PythonStdioTransport(
+        os.path.join(SERVER_DIR, 'server.py'), env=SERVER_ENV, cwd=SERVER_DIR
+    )
+    start = time.perf_counter()
+    async with Client(transport) as client:
+        await client.list_tools()
+        return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    imports, readies, clients = [], [], []
+    for _ in range(args.runs):
+        imports.append(time_import())
+        readies.append(await time_ready())
+        clients.append(time_clients())
+
+    print(f'{args.runs} runs, median (min) in ms')
+    for name, samples in (('import', imports), ('ready', readies), ('clients', clients)):
+        print(f'{name:<12}{1000 * statistics.median(samples):>9.0f} ({1000 * min(samples):.0f})')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
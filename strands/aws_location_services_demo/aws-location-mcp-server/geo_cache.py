@@ -0,0 +1,293 @@
+"""In-memory caches used by the Amazon Location MCP server tools."""
+
+import json
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from geo_utils import haversine_meters
+from loguru import logger
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a fixed time to live.
+
+    Memory is bounded by ``max_entries``; the least recently used entry is evicted
+    first. Hit, miss, expiry and eviction counts are kept for reporting.
+
+    With ``persist_path`` set, entries are also written through to a SQLite file and
+    reloaded on start, so they survive restarts. Persistent caches need string keys
+    and JSON-serializable values.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 10000,
+        ttl_seconds: float = 3600.0,
+        persist_path: str = None,
+    ):
+        """Initialize the cache, loading unexpired entries from persist_path if given."""
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        if persist_path:
+            self._open_store(persist_path)
+
+    def _open_store(self, path):
+        try:
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS cache '
+                '(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)'
+            )
+            db.execute('DELETE FROM cache WHERE expires_at <= ?', (time.time(),))
+            rows = db.execute(
+                'SELECT key, expires_at, value FROM cache ORDER BY expires_at DESC LIMIT ?',
+                (self.max_entries,),
+            ).fetchall()
+            db.commit()
+        except sqlite3.Error as e:
+            logger.error(f'Cannot open {self.name} cache store {path}: {str(e)}')
+            return
+        for key, expires_at, value in reversed(rows):
+            self._entries[key] = (expires_at, json.loads(value))
+        self._db = db
+        logger.debug(f'Loaded {len(rows)} {self.name} cache entries from {path}')
+
+    def _persist(self, statement, params):
+        """Run a write against the backing store; the caller holds the lock."""
+        if self._db is None:
+            return
+        try:
+            self._db.execute(statement, params)
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f'Failed to persist {self.name} cache entry: {str(e)}')
+
+    def get(self, key):
+        """Return the cached value for key, or None when missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._persist('DELETE FROM cache WHERE key = ?', (key,))
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl_seconds: float = None):
+        """Store value under key, evicting the least recently used entries if full."""
+        expires_at = time.time() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            if self._db is not None:
+                self._persist(
+                    'INSERT OR REPLACE INTO cache (key, expires_at, value) VALUES (?, ?, ?)',
+                    (key, expires_at, json.dumps(value)),
+                )
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._persist('DELETE FROM cache WHERE key = ?', (evicted_key,))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._persist('DELETE FROM cache', ())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Size and hit-rate counters for this cache."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'expirations': self.expirations,
+            'evictions': self.evictions,
+            'persistent': self._db is not None,
+        }
+
+
+class PlaceIndex:
+    """In-memory index of places the server has already fetched from search_nearby.
+
+    Places are stored once by PlaceId together with their position, categories and
+    fetch time. Every search also records the circle it covered: if the search came
+    back with fewer results than requested it saw every matching place inside its
+    radius, otherwise only up to the distance of its farthest result. A later query
+    whose circle lies inside a fresh covered circle for the same category can then
+    be answered locally by distance ranking. Searches that asked for additional
+    features (contacts, time zones) are indexed apart from those that did not, since
+    their places carry more fields.
+
+    Covered circles are bucketed in a grid of cells, at the level whose cells are at
+    least as wide as the circle's radius. A circle that can contain a query's center
+    then sits in the center's cell or one of its eight neighbours at its level, so a
+    lookup reads nine buckets per level in use instead of every circle.
+    """
+
+    # Grid cells are 2**-level degrees wide, level 20 is about 0.1 m
+    MAX_LEVEL = 20
+
+    def __init__(self, ttl_seconds: float = 300.0, max_places: int = 50000, max_regions: int = 5000):
+        """Initialize an empty index."""
+        self.ttl_seconds = ttl_seconds
+        self.max_places = max_places
+        self.max_regions = max_regions
+        self._places = OrderedDict()
+        self._regions = OrderedDict()
+        self._buckets = {}
+        self._levels = set()
+        self._lock = threading.Lock()
+        self._next_region_id = 0
+        self.local_answers = 0
+        self.uncovered = 0
+
+    @staticmethod
+    def _distance(item, longitude, latitude):
+        position = item.get('Position') or [longitude, latitude]
+        return haversine_meters(longitude, latitude, position[0], position[1])
+
+    @classmethod
+    def _level(cls, latitude, radius):
+        """Finest grid level whose cells are at least radius wide around latitude."""
+        # Longitude degrees are the narrower ones; a degree of margin covers circles
+        # of up to about 100 km whose center is off the query's latitude
+        meters_per_degree = 111320 * max(math.cos(math.radians(min(abs(latitude) + 1, 89.9))), 1e-3)
+        level = 0
+        while level < cls.MAX_LEVEL and meters_per_degree * 0.5 ** (level + 1) >= radius:
+            level += 1
+        return level
+
+    @staticmethod
+    def _cell(level, longitude, latitude):
+        size = 0.5**level
+        return math.floor(longitude / size), math.floor(latitude / size)
+
+    def _remove_region(self, region_id):
+        region = self._regions.pop(region_id)
+        bucket = self._buckets.get(region[-1])
+        if bucket is not None:
+            bucket.discard(region_id)
+            if not bucket:
+                del self._buckets[region[-1]]
+
+    def _candidates(self, scope, longitude, latitude):
+        """Ids of the regions bucketed in or next to the point's cell, at every level in use."""
+        for level in sorted(self._levels):
+            cell_x, cell_y = self._cell(level, longitude, latitude)
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    bucket = self._buckets.get((scope, level, cell_x + dx, cell_y + dy))
+                    if bucket:
+                        # A copy, expired regions are removed while it is read
+                        yield from tuple(bucket)
+
+    def add_region(self, category, longitude, latitude, radius, items, complete, features=()):
+        """Record the result items of one search and the circle they cover."""
+        scope = (category or '*', tuple(sorted(features)))
+        now = time.time()
+        if not complete:
+            # Results come back nearest first, so only the circle up to the farthest
+            # returned place is known to be complete
+            radius = min(
+                radius, max(self._distance(item, longitude, latitude) for item in items)
+            )
+        place_keys = []
+        with self._lock:
+            for item in items:
+                if not item.get('PlaceId'):
+                    continue
+                place_key = (scope[1], item['PlaceId'])
+                self._places[place_key] = (now, item)
+                self._places.move_to_end(place_key)
+                place_keys.append(place_key)
+            while len(self._places) > self.max_places:
+                self._places.popitem(last=False)
+            level = self._level(latitude, radius)
+            bucket_key = (scope, level, *self._cell(level, longitude, latitude))
+            region_id = self._next_region_id
+            self._next_region_id += 1
+            self._regions[region_id] = (
+                scope, longitude, latitude, radius, now, place_keys, bucket_key
+            )
+            self._buckets.setdefault(bucket_key, set()).add(region_id)
+            self._levels.add(level)
+            while len(self._regions) > self.max_regions:
+                self._remove_region(next(iter(self._regions)))
+
+    def query(self, category, longitude, latitude, radius, features=()):
+        """Return cached items within radius sorted by distance, or None if not covered.
+
+        An empty list means the area is covered and known to have no matching places.
+        """
+        scope = (category or '*', tuple(sorted(features)))
+        oldest = time.time() - self.ttl_seconds
+        with self._lock:
+            for region_id in self._candidates(scope, longitude, latitude):
+                center_lon, center_lat, region_radius, fetched_at, place_keys = self._regions[
+                    region_id
+                ][1:6]
+                if fetched_at < oldest:
+                    self._remove_region(region_id)
+                    continue
+                if region_radius < radius:
+                    continue
+                offset = haversine_meters(center_lon, center_lat, longitude, latitude)
+                if offset + radius > region_radius:
+                    continue
+                found = []
+                for place_key in place_keys:
+                    entry = self._places.get(place_key)
+                    if entry is None:
+                        # Evicted since the region was recorded, the coverage is no longer complete
+                        found = None
+                        break
+                    distance = self._distance(entry[1], longitude, latitude)
+                    if distance <= radius:
+                        found.append((distance, entry[1]))
+                if found is None:
+                    continue
+                self.local_answers += 1
+                return [item for _, item in sorted(found, key=lambda pair: pair[0])]
+            self.uncovered += 1
+            return None
+
+    def stats(self) -> dict:
+        """Index size and how often queries were answered locally."""
+        lookups = self.local_answers + self.uncovered
+        return {
+            'places': len(self._places),
+            'regions': len(self._regions),
+            'ttl_seconds': self.ttl_seconds,
+            'local_answers': self.local_answers,
+            'uncovered': self.uncovered,
+            'hit_rate': round(self.local_answers / lookups, 4) if lookups else 0.0,
+        }
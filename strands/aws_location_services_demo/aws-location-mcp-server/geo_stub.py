@@ -0,0 +1,334 @@
+"""Offline stand-in for the Amazon Location geo-places and geo-routes boto3 clients.
+
+Responses are built from synthetic fixtures in fixtures/, written in the shape of
+the service responses and moved to the requested position, so the server can be
+exercised and load tested without AWS credentials or quota. As with the service,
+places come with their contacts and opening hours only when AdditionalFeatures
+asks for Contact, and with their time zone only when it asks for TimeZone. Every call sleeps for a configurable latency and can be
+throttled, either at random or above a request rate, with the same
+ThrottlingException a real client raises.
+
+Start the server with GEO_STUB=1 to use it; the other settings are:
+
+    GEO_STUB_LATENCY_MS     mean latency of each call (default 50)
+    GEO_STUB_JITTER_MS      uniform +/- jitter around that latency (default 0)
+    GEO_STUB_THROTTLE_RATE  fraction of calls rejected at random (default 0)
+    GEO_STUB_MAX_TPS        calls per second per service before throttling (default unlimited)
+    GEO_STUB_FIXTURES       directory with the fixture responses (default fixtures/)
+
+With several AWS_REGIONS each region gets its own stub. GEO_STUB_REGION_LATENCY_MS
+and GEO_STUB_REGION_THROTTLE_RATE override the latency and throttle rate per
+region, e.g. GEO_STUB_REGION_LATENCY_MS='us-east-1=400,us-west-2=60'.
+"""
+
+import copy
+import json
+import math
+import os
+import random
+import threading
+import time
+import botocore.exceptions
+import polyline
+from geo_utils import haversine_meters
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Road distance is longer than the straight line between two points
+ROAD_DETOUR_FACTOR = 1.3
+TRAVEL_SPEEDS_MPS = {'Car': 22.0, 'Truck': 18.0, 'Scooter': 9.0, 'Pedestrian': 1.4}
+
+OPERATION_NAMES = {
+    'reverse_geocode': 'ReverseGeocode',
+    'search_nearby': 'SearchNearby',
+    'search_text': 'SearchText',
+    'get_place': 'GetPlace',
+    'calculate_routes': 'CalculateRoutes',
+    'calculate_route_matrix': 'CalculateRouteMatrix',
+    'calculate_isolines': 'CalculateIsolines',
+}
+
+
+def stub_enabled() -> bool:
+    """Whether GEO_STUB asks for the offline stub instead of real AWS clients."""
+    return os.environ.get('GEO_STUB', '').lower() in ('1', 'true', 'yes')
+
+
+def _region_setting(name, region, default):
+    """Value of a GEO_STUB_<name> setting, overridden for region by GEO_STUB_REGION_<name>."""
+    for entry in os.environ.get(f'GEO_STUB_REGION_{name}', '').split(','):
+        key, _, value = entry.partition('=')
+        if region and key.strip() == region and value.strip():
+            return float(value)
+    return float(os.environ.get(f'GEO_STUB_{name}', default))
+
+
+def _load_fixture(fixtures_dir, name):
+    with open(os.path.join(fixtures_dir, f'{name}.json')) as f:
+        return json.load(f)
+
+
+def _shift(position, dlon, dlat):
+    return [round(position[0] + dlon, 6), round(position[1] + dlat, 6)]
+
+
+def _with_features(place, features):
+    """Drop the parts of a place that only come back when AdditionalFeatures asks for them."""
+    features = set(features or ())
+    if 'Contact' not in features:
+        place.pop('Contacts', None)
+        place.pop('OpeningHours', None)
+    if 'TimeZone' not in features:
+        place.pop('TimeZone', None)
+    return place
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` calls per second with bursts of `rate`."""
+
+    def __init__(self, rate: float):
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        """Take one token, returning False when the bucket is empty."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class StubGeoClient:
+    """Blocking stand-in for a boto3 geo-places or geo-routes client.
+
+    Only the operations the server calls are implemented. Calls are counted per
+    operation in ``calls`` and rejected calls in ``throttled``.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 0.0,
+        throttle_rate: float = 0.0,
+        max_tps: float = 0.0,
+        fixtures_dir: str = FIXTURES_DIR,
+    ):
+        """Initialize the stub and load its fixture responses."""
+        self.service = service
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.bucket = TokenBucket(max_tps) if max_tps > 0 else None
+        self.calls = {}
+        self.throttled = 0
+        self._lock = threading.Lock()
+        if service == 'geo-places':
+            self._nearby = _load_fixture(fixtures_dir, 'geo_places_search_nearby')
+            self._reverse = _load_fixture(fixtures_dir, 'geo_places_reverse_geocode')
+        else:
+            self._routes = _load_fixture(fixtures_dir, 'geo_routes_calculate_routes')
+
+    @classmethod
+    def from_env(cls, service: str, region: str = None):
+        """Build a stub for a region configured by the GEO_STUB_* environment variables."""
+        return cls(
+            service,
+            latency_ms=_region_setting('LATENCY_MS', region, '50'),
+            jitter_ms=float(os.environ.get('GEO_STUB_JITTER_MS', '0')),
+            throttle_rate=_region_setting('THROTTLE_RATE', region, '0'),
+            max_tps=float(os.environ.get('GEO_STUB_MAX_TPS', '0')),
+            fixtures_dir=os.environ.get('GEO_STUB_FIXTURES', FIXTURES_DIR),
+        )
+
+    def _begin(self, operation):
+        """Count the call, sleep for the configured latency and apply throttling."""
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+        latency = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(0.0, latency) / 1000)
+        throttled = random.random() < self.throttle_rate
+        if not throttled and self.bucket is not None:
+            throttled = not self.bucket.take()
+        if throttled:
+            with self._lock:
+                self.throttled += 1
+            raise botocore.exceptions.ClientError(
+                {
+                    'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'},
+                    'ResponseMetadata': {'HTTPStatusCode': 429},
+                },
+                OPERATION_NAMES[operation],
+            )
+
+    def reverse_geocode(self, QueryPosition, **params):
+        self._begin('reverse_geocode')
+        response = copy.deepcopy(self._reverse)
+        center = response.pop('QueryPosition')
+        dlon, dlat = QueryPosition[0] - center[0], QueryPosition[1] - center[1]
+        for item in response['ResultItems']:
+            item['Position'] = _shift(item['Position'], dlon, dlat)
+            if 'MapView' in item:
+                view = item['MapView']
+                item['MapView'] = _shift(view[:2], dlon, dlat) + _shift(view[2:], dlon, dlat)
+        return response
+
+    def search_nearby(
+        self,
+        QueryPosition,
+        MaxResults=20,
+        QueryRadius=None,
+        Filter=None,
+        NextToken=None,
+        AdditionalFeatures=None,
+        **params,
+    ):
+        self._begin('search_nearby')
+        center = self._nearby['QueryPosition']
+        dlon, dlat = QueryPosition[0] - center[0], QueryPosition[1] - center[1]
+        categories = set((Filter or {}).get('IncludeCategories') or [])
+        items = []
+        for recorded in self._nearby['ResultItems']:
+            if categories and not categories & {c['Id'] for c in recorded.get('Categories', [])}:
+                continue
+            item = _with_features(copy.deepcopy(recorded), AdditionalFeatures)
+            item['Position'] = _shift(item['Position'], dlon, dlat)
+            item['Distance'] = round(haversine_meters(*QueryPosition, *item['Position']))
+            if QueryRadius is None or item['Distance'] <= QueryRadius:
+                items.append(item)
+        items.sort(key=lambda item: item['Distance'])
+        offset = int(NextToken.split(':')[1]) if NextToken else 0
+        response = {'ResultItems': items[offset : offset + MaxResults]}
+        if offset + MaxResults < len(items):
+            response['NextToken'] = f'stub:{offset + MaxResults}'
+        return response
+
+    def search_text(
+        self,
+        QueryText,
+        MaxResults=20,
+        BiasPosition=None,
+        Filter=None,
+        AdditionalFeatures=None,
+        **params,
+    ):
+        self._begin('search_text')
+        center = self._nearby['QueryPosition']
+        box = (Filter or {}).get('BoundingBox')
+        if box:
+            position = [(box[0] + box[2]) / 2, (box[1] + box[3]) / 2]
+        else:
+            position = BiasPosition or center
+        dlon, dlat = position[0] - center[0], position[1] - center[1]
+        words = QueryText.lower().split()
+        items = []
+        for recorded in self._nearby['ResultItems']:
+            text = ' '.join(
+                [recorded['Title']] + [c['Name'] for c in recorded.get('Categories', [])]
+            ).lower()
+            if not any(word in text for word in words):
+                continue
+            item = _with_features(copy.deepcopy(recorded), AdditionalFeatures)
+            item['Position'] = _shift(item['Position'], dlon, dlat)
+            item['Distance'] = round(haversine_meters(*position, *item['Position']))
+            items.append(item)
+        items.sort(key=lambda item: item['Distance'])
+        if box:
+            # Distances are only measured from a BiasPosition
+            for item in items:
+                del item['Distance']
+        return {'ResultItems': items[:MaxResults]}
+
+    def get_place(self, PlaceId, AdditionalFeatures=None, **params):
+        self._begin('get_place')
+        for recorded in self._nearby['ResultItems'] + self._reverse['ResultItems']:
+            if recorded['PlaceId'] == PlaceId:
+                place = _with_features(copy.deepcopy(recorded), AdditionalFeatures)
+                place.pop('Distance', None)
+                return place
+        raise botocore.exceptions.ClientError(
+            {
+                'Error': {'Code': 'ResourceNotFoundException', 'Message': 'Place not found'},
+                'ResponseMetadata': {'HTTPStatusCode': 404},
+            },
+            OPERATION_NAMES['get_place'],
+        )
+
+    def calculate_routes(self, Origin, Destination, TravelMode='Car', **params):
+        self._begin('calculate_routes')
+        response = copy.deepcopy(self._routes)
+        origin, destination = response.pop('Origin'), response.pop('Destination')
+        distance = ROAD_DETOUR_FACTOR * haversine_meters(*Origin, *Destination)
+        duration = distance / TRAVEL_SPEEDS_MPS.get(TravelMode, TRAVEL_SPEEDS_MPS['Car'])
+        route = response['Routes'][0]
+        scale = distance / max(route['Summary']['Distance'], 1)
+        route['Summary'] = {'Distance': round(distance), 'Duration': round(duration)}
+        # Stretch the fixture geometry so it runs from Origin to Destination
+        lon_scale = (Destination[0] - Origin[0]) / ((destination[0] - origin[0]) or 1)
+        lat_scale = (Destination[1] - Origin[1]) / ((destination[1] - origin[1]) or 1)
+        for leg in route['Legs']:
+            points = polyline.decode(leg['Geometry']['Polyline'])
+            leg['Geometry']['Polyline'] = polyline.encode(
+                [
+                    (
+                        Origin[1] + (latitude - origin[1]) * lat_scale,
+                        Origin[0] + (longitude - origin[0]) * lon_scale,
+                    )
+                    for latitude, longitude in points
+                ]
+            )
+            for step in leg['VehicleLegDetails']['TravelSteps']:
+                step['Distance'] = round(step['Distance'] * scale)
+                step['Duration'] = round(step['Duration'] * scale)
+        return response
+
+    def calculate_route_matrix(self, Origins, Destinations, TravelMode='Car', **params):
+        self._begin('calculate_route_matrix')
+        speed = TRAVEL_SPEEDS_MPS.get(TravelMode, TRAVEL_SPEEDS_MPS['Car'])
+        matrix = []
+        for origin in Origins:
+            row = []
+            for destination in Destinations:
+                distance = ROAD_DETOUR_FACTOR * haversine_meters(
+                    *origin['Position'], *destination['Position']
+                )
+                row.append({'Distance': round(distance), 'Duration': math.ceil(distance / speed)})
+            matrix.append(row)
+        return {'RouteMatrix': matrix, 'RoutingBoundary': {'Unbounded': True}}
+
+    def calculate_isolines(self, Origin, Thresholds, TravelMode='Car', **params):
+        self._begin('calculate_isolines')
+        speed = TRAVEL_SPEEDS_MPS.get(TravelMode, TRAVEL_SPEEDS_MPS['Car'])
+        meters_per_degree = 111320.0
+        isolines = []
+        for seconds in Thresholds.get('Time') or []:
+            reach = seconds * speed / ROAD_DETOUR_FACTOR
+            ring = []
+            for step in range(64):
+                # Lobed rather than round, reaching further along the three main roads
+                angle = 2 * math.pi * step / 64
+                radius = reach * (0.7 + 0.3 * math.cos(3 * angle))
+                ring.append(
+                    (
+                        Origin[1] + radius * math.sin(angle) / meters_per_degree,
+                        Origin[0]
+                        + radius
+                        * math.cos(angle)
+                        / (meters_per_degree * math.cos(math.radians(Origin[1]))),
+                    )
+                )
+            isolines.append(
+                {
+                    'TimeThreshold': seconds,
+                    'Geometries': [{'PolylinePolygon': [polyline.encode(ring + ring[:1])]}],
+                }
+            )
+        return {'IsolineGeometryFormat': 'FlexiblePolyline', 'Isolines': isolines}
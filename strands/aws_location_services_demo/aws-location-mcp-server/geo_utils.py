@@ -0,0 +1,59 @@
+"""Small geometry helpers shared by the Amazon Location MCP server tools."""
+
+import math
+
+
+EARTH_RADIUS_METERS = 6371008.8
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def haversine_meters(longitude1, latitude1, longitude2, latitude2):
+    """Great-circle distance in meters between two [longitude, latitude] points."""
+    phi1 = math.radians(latitude1)
+    phi2 = math.radians(latitude2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(longitude2 - longitude1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geohash_encode(longitude, latitude, precision=8):
+    """Encode a point as a geohash string of the given length.
+
+    Precision 4 is a cell of roughly 39 x 20 km, 6 is 1.2 x 0.6 km and 8 is
+    38 x 19 m.
+    """
+    lon_range = [-180.0, 180.0]
+    lat_range = [-90.0, 90.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value_range, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            value_range[0] = mid
+        else:
+            value_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def snap_position(position, grid_degrees):
+    """Snap a [longitude, latitude] position to a grid, returned as a 'lon,lat' string.
+
+    Used to build cache keys, so points within the same grid cell share an entry.
+    """
+    decimals = max(0, -int(math.floor(math.log10(grid_degrees))) + 1)
+    longitude = round(float(position[0]) / grid_degrees) * grid_degrees
+    latitude = round(float(position[1]) / grid_degrees) * grid_degrees
+    return f'{longitude:.{decimals}f},{latitude:.{decimals}f}'
+
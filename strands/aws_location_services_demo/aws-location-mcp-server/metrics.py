@@ -0,0 +1,196 @@
+"""Request instrumentation for the Amazon Location MCP server.
+
+Counters and latency histograms are kept in memory and are cheap to update from
+the hot path: one bisect and a few integer increments under a lock. snapshot()
+returns them as a dict for the MCP stats resource, prometheus() renders them in
+the Prometheus text exposition format for the HTTP /metrics route.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from collections import defaultdict
+
+
+# Upper bounds in seconds, from a cache hit to a slow multi-call tool
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# Error codes AWS uses when a request is rejected for exceeding a rate limit
+THROTTLING_CODES = {'ThrottlingException', 'TooManyRequestsException', 'Throttling'}
+
+
+class Histogram:
+    """Cumulative latency histogram with fixed bucket bounds."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """Initialize an empty histogram."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside the bucket that holds it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'mean_ms': round(1000 * self.sum / self.count, 2) if self.count else 0.0,
+            'p50_ms': round(1000 * self.quantile(0.50), 2),
+            'p95_ms': round(1000 * self.quantile(0.95), 2),
+            'p99_ms': round(1000 * self.quantile(0.99), 2),
+        }
+
+
+class Metrics:
+    """Tool, AWS API and search_nearby counters for one server process."""
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.tool_latency = defaultdict(Histogram)
+        self.tool_errors = defaultdict(int)
+        self.aws_latency = defaultdict(Histogram)
+        self.aws_throttles = defaultdict(int)
+        self.aws_errors = defaultdict(int)
+        self.expansion_depth = defaultdict(int)
+
+    def observe_tool(self, tool: str, seconds: float, error: bool = False):
+        with self._lock:
+            self.tool_latency[tool].observe(seconds)
+            if error:
+                self.tool_errors[tool] += 1
+
+    def observe_aws(self, service: str, operation: str, seconds: float, error_code: str = None):
+        """Record one AWS API call; error_code is the ClientError code if it failed."""
+        key = (service, operation)
+        with self._lock:
+            self.aws_latency[key].observe(seconds)
+            if error_code in THROTTLING_CODES:
+                self.aws_throttles[key] += 1
+            elif error_code:
+                self.aws_errors[key + (error_code,)] += 1
+
+    def observe_expansion(self, depth: int, source: str):
+        """Record how many radius expansions a search_nearby needed and what answered it.
+
+        source is 'local' (place index), 'aws' or 'empty' when no tier had results.
+        """
+        with self._lock:
+            self.expansion_depth[(source, depth)] += 1
+
+    def instrument_tool(self, function):
+        """Decorator timing an async MCP tool; a result with an 'error' key counts as an error."""
+
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            error = True
+            try:
+                result = await function(*args, **kwargs)
+                error = isinstance(result, dict) and 'error' in result
+                return result
+            finally:
+                self.observe_tool(function.__name__, time.perf_counter() - start, error)
+
+        return wrapper
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'uptime_seconds': round(time.time() - self.started_at, 1),
+                'tools': {
+                    tool: dict(histogram.summary(), errors=self.tool_errors[tool])
+                    for tool, histogram in sorted(self.tool_latency.items())
+                },
+                'aws_calls': {
+                    f'{service}:{operation}': dict(
+                        histogram.summary(),
+                        throttles=self.aws_throttles[(service, operation)],
+                        errors={
+                            code: count
+                            for (error_service, error_operation, code), count in self.aws_errors.items()
+                            if (error_service, error_operation) == (service, operation)
+                        },
+                    )
+                    for (service, operation), histogram in sorted(self.aws_latency.items())
+                },
+                'search_nearby_expansion_depth': {
+                    f'{source}:{depth}': count
+                    for (source, depth), count in sorted(self.expansion_depth.items())
+                },
+            }
+
+    def prometheus(self, caches: dict = None, limiters: dict = None, regions: dict = None) -> str:
+        """Render all counters, plus cache, limiter and region stats if given, as Prometheus text."""
+        lines = []
+
+        def histogram_lines(name, labels, histogram):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.sum:.6f}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+        with self._lock:
+            lines.append('# TYPE location_tool_latency_seconds histogram')
+            for tool, histogram in sorted(self.tool_latency.items()):
+                histogram_lines('location_tool_latency_seconds', f'tool="{tool}"', histogram)
+            lines.append('# TYPE location_tool_errors_total counter')
+            for tool, count in sorted(self.tool_errors.items()):
+                lines.append(f'location_tool_errors_total{{tool="{tool}"}} {count}')
+            lines.append('# TYPE location_aws_call_latency_seconds histogram')
+            for (service, operation), histogram in sorted(self.aws_latency.items()):
+                labels = f'service="{service}",operation="{operation}"'
+                histogram_lines('location_aws_call_latency_seconds', labels, histogram)
+            lines.append('# TYPE location_aws_throttles_total counter')
+            for (service, operation), count in sorted(self.aws_throttles.items()):
+                lines.append(
+                    f'location_aws_throttles_total{{service="{service}",operation="{operation}"}} {count}'
+                )
+            lines.append('# TYPE location_aws_errors_total counter')
+            for (service, operation, code), count in sorted(self.aws_errors.items()):
+                lines.append(
+                    f'location_aws_errors_total{{service="{service}",operation="{operation}",'
+                    f'code="{code}"}} {count}'
+                )
+            lines.append('# TYPE location_search_nearby_expansions_total counter')
+            for (source, depth), count in sorted(self.expansion_depth.items()):
+                lines.append(
+                    f'location_search_nearby_expansions_total{{source="{source}",depth="{depth}"}} {count}'
+                )
+        for prefix, label, groups in (
+            ('cache', 'cache', caches),
+            ('limiter', 'api', limiters),
+            ('region', 'region', regions),
+        ):
+            for name, stats in sorted((groups or {}).items()):
+                for key, value in stats.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        lines.append(f'location_{prefix}_{key}{{{label}="{name}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
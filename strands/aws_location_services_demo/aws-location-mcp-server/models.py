@@ -0,0 +1,148 @@
+"""Compact result records for geo-places items and a fast JSON encoder for tool results.
+
+A geo-places result item is a deep dict with far more than a tool returns.
+Place.from_item() reads the parts the tools use in one pass over the item into a
+slots dataclass, which is also what the place detail cache keeps, and
+Place.to_dict() picks the requested fields from it for the tool output. Contacts
+and opening hours are typed dicts already in output form; pydantic, which FastMCP
+uses for the structured content, walks plain dicts much faster than dataclasses.
+
+dumps() is the FastMCP tool serializer. It uses orjson when it is installed and
+falls back to the standard library json module otherwise.
+"""
+
+import dataclasses
+import json
+from dataclasses import dataclass
+from geo_utils import haversine_meters
+from typing import Dict, List, Optional, TypedDict
+
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+PLACE_FIELDS = (
+    'place_id',
+    'name',
+    'address',
+    'coordinates',
+    'distance_meters',
+    'categories',
+    'contacts',
+    'opening_hours',
+)
+NOT_AVAILABLE = 'Not available'
+
+
+def _values(entries):
+    return [entry['Value'] for entry in entries or ()]
+
+
+class Contacts(TypedDict):
+    phones: List[str]
+    websites: List[str]
+    emails: List[str]
+    faxes: List[str]
+
+
+class OpeningHours(TypedDict):
+    display: List[str]
+    components: List[dict]
+    open_now: Optional[bool]
+    categories: List[str]
+
+
+def contacts_from_item(item) -> Contacts:
+    contacts = item.get('Contacts') or {}
+    return {
+        'phones': _values(contacts.get('Phones')),
+        'websites': _values(contacts.get('Websites')),
+        'emails': _values(contacts.get('Emails')),
+        'faxes': _values(contacts.get('Faxes')),
+    }
+
+
+def opening_hours_from_item(item) -> List[OpeningHours]:
+    """Opening hours entries of an item, also looked up under Contacts."""
+    entries = item.get('OpeningHours')
+    if not entries:
+        entries = (item.get('Contacts') or {}).get('OpeningHours')
+    if not entries:
+        return []
+    if isinstance(entries, dict):
+        entries = [entries]
+    return [
+        {
+            'display': entry.get('Display') or entry.get('display') or [],
+            'components': entry.get('Components') or entry.get('components') or [],
+            'open_now': entry.get('OpenNow'),
+            'categories': [category.get('Name') for category in entry.get('Categories') or ()],
+        }
+        for entry in entries
+    ]
+
+
+@dataclass(slots=True)
+class Place:
+    """The fields of a geo-places result item that tools return."""
+
+    place_id: str
+    name: str
+    address: str
+    coordinates: Dict[str, Optional[float]]
+    distance_meters: Optional[int] = None
+    categories: List[str] = dataclasses.field(default_factory=list)
+    contacts: Optional[Contacts] = None
+    opening_hours: Optional[List[OpeningHours]] = None
+
+    @classmethod
+    def from_item(cls, item, origin=None, fields=PLACE_FIELDS):
+        """Extract a place from a result item, reading only what fields needs beyond the basics.
+
+        distance_meters is measured from origin, a (longitude, latitude) pair, when
+        given and taken from the AWS result otherwise.
+        """
+        position = item.get('Position') or (None, None)
+        if 'distance_meters' not in fields:
+            distance = None
+        elif origin is not None and position[0] is not None:
+            distance = haversine_meters(origin[0], origin[1], position[0], position[1])
+        else:
+            distance = item.get('Distance')
+        return cls(
+            item.get('PlaceId', NOT_AVAILABLE),
+            item.get('Title', NOT_AVAILABLE),
+            (item.get('Address') or {}).get('Label', NOT_AVAILABLE),
+            {'longitude': position[0], 'latitude': position[1]},
+            round(distance) if distance is not None else None,
+            [category.get('Name') for category in item.get('Categories') or ()],
+            contacts_from_item(item) if 'contacts' in fields else None,
+            opening_hours_from_item(item) if 'opening_hours' in fields else None,
+        )
+
+    def to_dict(self, fields=PLACE_FIELDS):
+        """Tool output for the requested fields, in the order they were requested."""
+        return {field: getattr(self, field) for field in fields}
+
+
+def _json_default(value):
+    if dataclasses.is_dataclass(value):
+        return {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
+    return str(value)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(value) -> str:
+        """Serialize a tool result to compact JSON text."""
+        return orjson.dumps(value, default=_json_default, option=_ORJSON_OPTIONS).decode()
+
+else:
+
+    def dumps(value) -> str:
+        """Serialize a tool result to compact JSON text."""
+        return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=_json_default)
@@ -0,0 +1,203 @@
+"""Opening hours of geo-places results compiled to weekly minute intervals.
+
+Amazon Location describes opening hours as components such as
+
+    {'OpenTime': 'T070000', 'OpenDuration': 'PT12H00M',
+     'Recurrence': 'FREQ:DAILY;BYDAY:MO,TU,WE,TH,FR'}
+
+compile_components() turns them into sorted, merged [start, end) intervals in
+minutes since Monday 00:00. Intervals are repeated over the previous and the next
+week, so hours running past midnight on Sunday are found from either side.
+Compiled schedules are cached, so chains sharing the same hours are compiled once.
+
+WeeklySchedules then evaluates open-at-time for a whole result set at once with
+NumPy instead of looping over places and display strings.
+"""
+
+import datetime
+import functools
+import re
+import zoneinfo
+import numpy as np
+
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+WEEKDAY_NAMES = {
+    name: index
+    for index, day in enumerate(
+        ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+    )
+    for name in (day, day[:3])
+}
+
+_OPEN_TIME = re.compile(r'T?(\d{2}):?(\d{2})(?::?(\d{2}))?')
+_DURATION = re.compile(r'P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?')
+
+
+def _parse_open_time(value):
+    match = _OPEN_TIME.fullmatch(value or '')
+    if not match:
+        raise ValueError(f'Invalid OpenTime {value!r}')
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+def _parse_duration(value):
+    match = _DURATION.fullmatch(value or '')
+    if not match or not any(match.groups()):
+        raise ValueError(f'Invalid OpenDuration {value!r}')
+    days, hours, minutes, seconds = (int(group or 0) for group in match.groups())
+    return days * MINUTES_PER_DAY + hours * 60 + minutes + (seconds + 59) // 60
+
+
+def _parse_days(recurrence):
+    """Weekday indexes a recurrence rule applies to, every day when it has no BYDAY."""
+    for part in (recurrence or '').split(';'):
+        key, _, value = part.replace('=', ':').partition(':')
+        if key.strip().upper() == 'BYDAY':
+            return [WEEKDAYS.index(day.strip().upper()[-2:]) for day in value.split(',') if day]
+    return list(range(7))
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_components(components):
+    """Compile (OpenTime, OpenDuration, Recurrence) tuples to an (n, 2) interval array.
+
+    Intervals are minutes since Monday 00:00, repeated one week earlier and one
+    week later, sorted and merged. Components that cannot be parsed are skipped.
+    """
+    intervals = []
+    for open_time, duration, recurrence in components:
+        try:
+            start = _parse_open_time(open_time)
+            length = min(_parse_duration(duration), MINUTES_PER_WEEK)
+            days = _parse_days(recurrence)
+        except ValueError:
+            continue
+        for day in days:
+            for week in (-MINUTES_PER_WEEK, 0, MINUTES_PER_WEEK):
+                begin = week + day * MINUTES_PER_DAY + start
+                intervals.append((begin, begin + length))
+    if not intervals:
+        return np.empty((0, 2), dtype=np.int32)
+    intervals.sort()
+    merged = [list(intervals[0])]
+    for begin, end in intervals[1:]:
+        if begin <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([begin, end])
+    return np.array(merged, dtype=np.int32)
+
+
+def _category_ids(categories):
+    return {category.get('Id') for category in categories or []}
+
+
+def item_components(item):
+    """Hashable opening hours components of a geo-places result item.
+
+    A place can list hours per service, e.g. a store and its pharmacy. The entries
+    for the place's primary category are used, else those without categories, and
+    only when neither exists the union of all of them.
+    """
+    entries = item.get('OpeningHours') or (item.get('Contacts') or {}).get('OpeningHours') or []
+    if isinstance(entries, dict):
+        entries = [entries]
+    if len(entries) > 1:
+        categories = item.get('Categories') or []
+        primary = _category_ids(category for category in categories if category.get('Primary'))
+        if not primary:
+            primary = _category_ids(categories[:1])
+        matching = [entry for entry in entries if primary & _category_ids(entry.get('Categories'))]
+        if not matching:
+            matching = [entry for entry in entries if not entry.get('Categories')]
+        entries = matching or entries
+    return tuple(
+        (component.get('OpenTime'), component.get('OpenDuration'), component.get('Recurrence'))
+        for entry in entries
+        for component in entry.get('Components') or []
+    )
+
+
+def minute_of_week(moment):
+    """Minutes since Monday 00:00 of a datetime, in its own time zone."""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def local_minute_of_week(item, now):
+    """Current minute of the week at a place, from its TimeZone or else its longitude.
+
+    now is an aware datetime.
+    """
+    time_zone = item.get('TimeZone') or {}
+    if time_zone.get('Name'):
+        try:
+            return minute_of_week(now.astimezone(zoneinfo.ZoneInfo(time_zone['Name'])))
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            pass
+    offset = time_zone.get('OffsetSeconds')
+    if offset is None:
+        # Solar time is a fair guess within an hour or two of the civil time zone
+        offset = round((item.get('Position') or [0])[0] / 15) * 3600
+    return minute_of_week(now.astimezone(datetime.timezone(datetime.timedelta(seconds=offset))))
+
+
+def parse_weekly_time(value):
+    """Parse 'Saturday 21:00', 'sat 9:30' or an ISO date and time to a minute of the week."""
+    text = value.strip()
+    try:
+        return minute_of_week(datetime.datetime.fromisoformat(text))
+    except ValueError:
+        pass
+    expected = f"Invalid time {value!r}, expected e.g. 'Saturday 21:00' or '2025-06-07T21:00'"
+    day, _, clock = text.partition(' ')
+    if day.lower() not in WEEKDAY_NAMES:
+        raise ValueError(expected)
+    hours, _, minutes = clock.strip().partition(':')
+    try:
+        hours, minutes = int(hours), int(minutes or 0)
+    except ValueError:
+        raise ValueError(expected) from None
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f'Invalid time of day in {value!r}')
+    return WEEKDAY_NAMES[day.lower()] * MINUTES_PER_DAY + hours * 60 + minutes
+
+
+class WeeklySchedules:
+    """Compiled opening hours of a result set, flattened for vectorized evaluation."""
+
+    def __init__(self, items):
+        """Compile the opening hours of every item; items without hours are unknown."""
+        compiled = [compile_components(item_components(item)) for item in items]
+        self.size = len(items)
+        self.known = np.array([len(intervals) > 0 for intervals in compiled], dtype=bool)
+        counts = [len(intervals) for intervals in compiled]
+        self.owner = np.repeat(np.arange(self.size), counts)
+        if self.owner.size:
+            intervals = np.concatenate(compiled)
+        else:
+            intervals = np.empty((0, 2), dtype=np.int32)
+        self.starts = intervals[:, 0]
+        self.ends = intervals[:, 1]
+
+    def evaluate(self, minutes):
+        """Open state at a minute of the week, one value per item or one for all.
+
+        Returns (is_open, closes_in, opens_in): a boolean array and minute arrays with
+        -1 where not applicable. Places open around the clock close in MINUTES_PER_WEEK.
+        """
+        minutes = np.broadcast_to(np.asarray(minutes, dtype=np.int64), (self.size,))
+        at = minutes[self.owner]
+        inside = (self.starts <= at) & (at < self.ends)
+        is_open = np.zeros(self.size, dtype=bool)
+        is_open[self.owner[inside]] = True
+        closes_in = np.full(self.size, -1, dtype=np.int64)
+        np.maximum.at(closes_in, self.owner[inside], (self.ends - at)[inside])
+        closes_in = np.minimum(closes_in, MINUTES_PER_WEEK)
+        later = self.starts > at
+        opens_in = np.full(self.size, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(opens_in, self.owner[later], (self.starts - at)[later])
+        opens_in[is_open | ~self.known | (opens_in == np.iinfo(np.int64).max)] = -1
+        return is_open, closes_in, opens_in
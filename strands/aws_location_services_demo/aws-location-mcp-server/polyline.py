@@ -0,0 +1,138 @@
+"""Decoding and encoding of the FlexiblePolyline format used for Amazon Location route geometry.
+
+The format is a header (version, precision and optional third dimension) followed by
+zig-zag, variable-length encoded deltas written in a URL-safe base64 alphabet.
+decode() is a plain Python reference implementation; decode_array() decodes the whole
+string at once with NumPy and is the one to use for long routes. NumPy is only
+imported by decode_array(), so importing this module stays cheap.
+"""
+
+import functools
+
+
+ENCODING_TABLE = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'
+DECODING_TABLE = {char: index for index, char in enumerate(ENCODING_TABLE)}
+FORMAT_VERSION = 1
+
+
+@functools.lru_cache(maxsize=None)
+def _byte_table():
+    """Byte value -> 6-bit value lookup for the vectorized decoder, -1 marks invalid bytes."""
+    import numpy as np
+
+    table = np.full(256, -1, dtype=np.int64)
+    table[np.frombuffer(ENCODING_TABLE.encode('ascii'), dtype=np.uint8)] = np.arange(64)
+    return table
+
+
+def _decode_unsigned_values(encoded):
+    result = 0
+    shift = 0
+    for char in encoded:
+        value = DECODING_TABLE[char]
+        result |= (value & 0x1F) << shift
+        if value & 0x20:
+            shift += 5
+        else:
+            yield result
+            result = 0
+            shift = 0
+    if shift:
+        raise ValueError('Invalid FlexiblePolyline: truncated value')
+
+
+def _to_signed(value):
+    if value & 1:
+        value = ~value
+    return value >> 1
+
+
+def decode(encoded):
+    """Decode a FlexiblePolyline into a list of (latitude, longitude[, third]) tuples."""
+    values = _decode_unsigned_values(encoded)
+    version = next(values)
+    if version != FORMAT_VERSION:
+        raise ValueError(f'Unsupported FlexiblePolyline version {version}')
+    header = next(values)
+    factor = 10 ** (header & 0x0F)
+    third_dimension = (header >> 4) & 0x07
+    third_factor = 10 ** ((header >> 7) & 0x0F)
+
+    points = []
+    latitude = longitude = third = 0
+    for value in values:
+        latitude += _to_signed(value)
+        longitude += _to_signed(next(values))
+        if third_dimension:
+            third += _to_signed(next(values))
+            points.append((latitude / factor, longitude / factor, third / third_factor))
+        else:
+            points.append((latitude / factor, longitude / factor))
+    return points
+
+
+def decode_array(encoded):
+    """Decode a FlexiblePolyline into an (n, 2) or (n, 3) float array in one vectorized pass.
+
+    Columns are latitude, longitude and, when present, the third dimension.
+    """
+    import numpy as np
+
+    codes = _byte_table()[np.frombuffer(encoded.encode('ascii'), dtype=np.uint8)]
+    if codes.size == 0 or (codes < 0).any():
+        raise ValueError('Invalid FlexiblePolyline: unexpected character')
+    # A character without the continuation bit ends a value
+    ends = np.flatnonzero((codes & 0x20) == 0)
+    if ends.size < 2 or ends[-1] != codes.size - 1:
+        raise ValueError('Invalid FlexiblePolyline: truncated value')
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    # Each character carries 5 bits, shifted by its position within the value
+    value_index = np.repeat(np.arange(ends.size), ends - starts + 1)
+    shifts = 5 * (np.arange(codes.size) - starts[value_index])
+    values = np.add.reduceat((codes & 0x1F) << shifts, starts)
+
+    version, header = int(values[0]), int(values[1])
+    if version != FORMAT_VERSION:
+        raise ValueError(f'Unsupported FlexiblePolyline version {version}')
+    dimensions = 3 if (header >> 4) & 0x07 else 2
+    deltas = values[2:]
+    if deltas.size % dimensions:
+        raise ValueError('Invalid FlexiblePolyline: incomplete coordinate')
+    deltas = np.where(deltas & 1, ~deltas, deltas) >> 1
+    points = np.cumsum(deltas.reshape(-1, dimensions), axis=0).astype(np.float64)
+    points[:, :2] /= 10 ** (header & 0x0F)
+    if dimensions == 3:
+        points[:, 2] /= 10 ** ((header >> 7) & 0x0F)
+    return points
+
+
+def _encode_unsigned(value, chars):
+    while value > 0x1F:
+        chars.append(ENCODING_TABLE[(value & 0x1F) | 0x20])
+        value >>= 5
+    chars.append(ENCODING_TABLE[value])
+
+
+def _encode_signed(value, chars):
+    value <<= 1
+    if value < 0:
+        value = ~value
+    _encode_unsigned(value, chars)
+
+
+def encode(points, precision=5):
+    """Encode (latitude, longitude) points as a two-dimensional FlexiblePolyline."""
+    factor = 10**precision
+    chars = []
+    _encode_unsigned(FORMAT_VERSION, chars)
+    _encode_unsigned(precision, chars)
+    last_latitude = last_longitude = 0
+    for point in points:
+        latitude = round(point[0] * factor)
+        longitude = round(point[1] * factor)
+        _encode_signed(latitude - last_latitude, chars)
+        _encode_signed(longitude - last_longitude, chars)
+        last_latitude, last_longitude = latitude, longitude
+    return ''.join(chars)
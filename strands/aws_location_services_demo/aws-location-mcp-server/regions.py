@@ -0,0 +1,144 @@
+"""Region selection and hedging policy for Amazon Location calls across several regions.
+
+The server can be given a list of regions (AWS_REGIONS). RegionRouter keeps recent
+latencies and an error rate per region and ranks the regions by them, so the
+primary region for a call is the one currently answering best rather than the
+first configured.
+
+A call goes to the primary region first. If it has not answered after the
+hedge delay, the recent latency percentile of that API in that region, the same
+call is sent to the next region and the first answer wins. Hedges are capped at a
+fraction of all calls, so a region that is slow across the board does not double
+the request volume.
+"""
+
+import collections
+import math
+import threading
+
+
+# Latencies kept per region and API to estimate the hedge delay percentile
+RECENT_LATENCIES = 200
+# Samples needed before the percentile replaces the configured initial delay
+MIN_SAMPLES = 20
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+class RegionStats:
+    """Recent latency and outcome counters for one region."""
+
+    def __init__(self, name: str, order: int):
+        """Initialize empty stats; order is the region's position in the configuration."""
+        self.name = name
+        self.order = order
+        self.latencies = collections.defaultdict(lambda: collections.deque(maxlen=RECENT_LATENCIES))
+        self.mean_latency = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    def score(self) -> float:
+        """Lower is better: mean latency inflated by the recent error rate."""
+        if self.mean_latency is None:
+            return math.inf
+        return self.mean_latency * (1.0 + 10.0 * self.error_rate)
+
+    def stats(self) -> dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'error_rate': round(self.error_rate, 4),
+            'mean_latency_ms': round(1000 * self.mean_latency, 1)
+            if self.mean_latency is not None
+            else None,
+            'hedges_sent': self.hedges_sent,
+            'hedges_won': self.hedges_won,
+        }
+
+
+class RegionRouter:
+    """Ranks regions by recent latency and errors and decides when to hedge a call."""
+
+    def __init__(
+        self,
+        regions,
+        hedge_percentile: float = 0.95,
+        initial_hedge_delay: float = 1.0,
+        min_hedge_delay: float = 0.02,
+        hedge_budget: float = 0.1,
+    ):
+        """Initialize the router with regions in order of preference until stats exist."""
+        self.regions = {name: RegionStats(name, order) for order, name in enumerate(regions)}
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.hedge_budget = hedge_budget
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._hedges = 0
+
+    @property
+    def multi_region(self) -> bool:
+        return len(self.regions) > 1
+
+    def ranked(self):
+        """Region names, best first; regions without samples keep their configured order."""
+        with self._lock:
+            return [
+                stats.name
+                for stats in sorted(
+                    self.regions.values(),
+                    key=lambda stats: (stats.score() == math.inf, stats.score(), stats.order),
+                )
+            ]
+
+    def hedge_delay(self, region: str, api: str) -> float:
+        """Seconds to wait for region before hedging, the recent latency percentile of api."""
+        with self._lock:
+            samples = self.regions[region].latencies.get(api)
+            if not samples or len(samples) < MIN_SAMPLES:
+                return self.initial_hedge_delay
+            return max(self.min_hedge_delay, _percentile(samples, self.hedge_percentile))
+
+    def start_call(self):
+        with self._lock:
+            self._calls += 1
+
+    def try_hedge(self, region: str) -> bool:
+        """Take a hedge from the budget for a call about to be sent to region."""
+        with self._lock:
+            if self._hedges >= self.hedge_budget * self._calls + 1:
+                return False
+            self._hedges += 1
+            self.regions[region].hedges_sent += 1
+            return True
+
+    def hedge_won(self, region: str):
+        with self._lock:
+            self.regions[region].hedges_won += 1
+
+    def observe(self, region: str, api: str, seconds: float, error: bool = False):
+        """Record one finished call to region; errors count against its ranking."""
+        with self._lock:
+            stats = self.regions.get(region)
+            if stats is None:
+                return
+            stats.calls += 1
+            stats.error_rate = 0.9 * stats.error_rate + (0.1 if error else 0.0)
+            if error:
+                stats.errors += 1
+                return
+            stats.latencies[api].append(seconds)
+            stats.mean_latency = (
+                seconds if stats.mean_latency is None else 0.9 * stats.mean_latency + 0.1 * seconds
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {name: stats.stats() for name, stats in self.regions.items()}
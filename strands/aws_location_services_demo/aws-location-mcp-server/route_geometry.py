@@ -0,0 +1,134 @@
+"""Vectorized helpers for route and isoline geometry decoded from FlexiblePolyline.
+
+All functions take (n, 2+) float arrays whose first two columns are latitude and
+longitude, as returned by polyline.decode_array().
+"""
+
+import numpy as np
+from geo_utils import EARTH_RADIUS_METERS
+
+
+def cumulative_distances(points):
+    """Distance in meters along the route from the first point to every point."""
+    latitudes = np.radians(points[:, 0])
+    longitudes = np.radians(points[:, 1])
+    dlat = np.diff(latitudes)
+    dlon = np.diff(longitudes)
+    a = np.sin(dlat / 2) ** 2 + np.cos(latitudes[:-1]) * np.cos(latitudes[1:]) * np.sin(dlon / 2) ** 2
+    segments = 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+    return np.concatenate(([0.0], np.cumsum(segments)))
+
+
+def sample_indexes(cumulative, interval_meters, max_samples):
+    """Indexes of points roughly every interval_meters along the route.
+
+    The start and end are always included; the interval is widened when the route
+    would need more than max_samples points.
+    """
+    total = cumulative[-1]
+    if max_samples > 1 and total / interval_meters + 1 > max_samples:
+        interval_meters = total / (max_samples - 1)
+    targets = np.arange(interval_meters, total, interval_meters)
+    indexes = np.searchsorted(cumulative, targets)
+    return np.unique(np.concatenate(([0], indexes, [len(cumulative) - 1])))
+
+
+def nearest_index(points, longitude, latitude, start=0, end=None):
+    """Index of the point in points[start:end] closest to a position."""
+    window = points[start:end]
+    scale = np.cos(np.radians(latitude)) ** 2
+    squared = (window[:, 0] - latitude) ** 2 + scale * (window[:, 1] - longitude) ** 2
+    return start + int(np.argmin(squared))
+
+
+def _project(points):
+    """Equirectangular projection to meters around the route's mean latitude."""
+    latitudes = np.radians(points[:, 0])
+    longitudes = np.radians(points[:, 1])
+    scale = np.cos(latitudes.mean())
+    return np.column_stack((longitudes * scale, latitudes)) * EARTH_RADIUS_METERS
+
+
+def _radial_keep(xy, tolerance_meters):
+    """Keep one point per tolerance_meters travelled along the line, plus the ends."""
+    segments = np.hypot(*np.diff(xy, axis=0).T)
+    buckets = np.floor(np.concatenate(([0.0], np.cumsum(segments))) / tolerance_meters)
+    keep = np.empty(len(xy), dtype=bool)
+    keep[0] = True
+    keep[1:] = buckets[1:] != buckets[:-1]
+    keep[-1] = True
+    return np.flatnonzero(keep)
+
+
+def _douglas_peucker_keep(xy, tolerance_meters):
+    """Douglas-Peucker over xy, returning a boolean mask of the points to keep."""
+    keep = np.zeros(len(xy), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(xy) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = xy[first], xy[last]
+        interior = xy[first + 1 : last]
+        segment = end - start
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(*(interior - start).T)
+        else:
+            # Perpendicular distance of every interior point to the chord
+            offsets = interior - start
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance_meters:
+            index = first + 1 + farthest
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return keep
+
+
+def simplify(points, tolerance_meters):
+    """Simplify a route so no removed point is more than tolerance_meters off the result.
+
+    A cheap distance-based pass first drops points closer together than half the
+    tolerance, then Douglas-Peucker removes the points that do not change the shape
+    by more than the other half. Each pass moves the line by at most its half, so
+    the two together stay within the tolerance.
+    """
+    if len(points) <= 2 or tolerance_meters <= 0:
+        return points
+    xy = _project(points)
+    radial = _radial_keep(xy, tolerance_meters / 2)
+    keep = _douglas_peucker_keep(xy[radial], tolerance_meters / 2)
+    return points[radial[keep]]
+
+
+def points_in_polygon(latitudes, longitudes, rings):
+    """Boolean mask of the points inside a polygon given as a list of rings.
+
+    The first ring is the outer boundary and any others are holes. Every point is
+    tested against every edge at once with the even-odd rule, so holes need no
+    special handling. Rings may or may not repeat their first point at the end.
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)[:, None]
+    longitudes = np.asarray(longitudes, dtype=np.float64)[:, None]
+    starts = np.concatenate([ring[:, :2] for ring in rings])
+    ends = np.concatenate([np.roll(ring[:, :2], -1, axis=0) for ring in rings])
+    lat1, lon1 = starts[:, 0], starts[:, 1]
+    lat2, lon2 = ends[:, 0], ends[:, 1]
+    # Edges straddling each point's latitude, and where they cross it
+    straddles = (lat1 > latitudes) != (lat2 > latitudes)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossing = lon1 + (latitudes - lat1) * (lon2 - lon1) / (lat2 - lat1)
+    crossings = straddles & (longitudes < crossing)
+    return (crossings.sum(axis=1) % 2).astype(bool)
+
+
+def distances_from(points, longitude, latitude):
+    """Great-circle distance in meters from a position to every point."""
+    latitudes = np.radians(points[:, 0])
+    dlat = latitudes - np.radians(latitude)
+    dlon = np.radians(points[:, 1] - longitude)
+    a = np.sin(dlat / 2) ** 2 + np.cos(np.radians(latitude)) * np.cos(latitudes) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
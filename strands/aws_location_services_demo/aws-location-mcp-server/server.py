@@ -12,17 +12,34 @@
 """Amazon Location Service MCP Server implementation using geo-places client only."""
 
 import asyncio
-import boto3
-import botocore.config
 import botocore.exceptions
+import datetime
+import functools
 import os
+import random
 import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from geo_cache import PlaceIndex, TTLCache
+import geo_stub
+import polyline
+from regions import RegionRouter
+from throttle import LimiterRegistry
+from geo_utils import geohash_encode, haversine_meters, snap_position
 from loguru import logger
-from mcp.server.fastmcp import Context
+from metrics import THROTTLING_CODES, metrics
+from models import PLACE_FIELDS, Place, dumps
 from fastmcp import FastMCP
 from pydantic import Field
-from typing import Dict, Optional
-import httpx
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from typing import Dict, List, Optional
+
+# boto3 and the NumPy based modules (numpy, route_geometry, opening_hours) are
+# imported where they are first used. The server is spawned per agent session over
+# stdio, and loading them up front made every cold start pay for them.
 
 
 # Set up logging
@@ -40,9 +57,12 @@ mcp = FastMCP(
     ## Features
     - Search for places using text queries
     - Get place details by PlaceId
-    - Reverse geocode coordinates
+    - Reverse geocode coordinates, one point or many at once
     - Search for places nearby a location
     - Search for places open now (extension)
+    - Calculate routes and origin x destination travel time matrices
+    - Search for places along a route
+    - Search for places reachable within a travel time
 
     ## Prerequisites
     1. Have an AWS account with Amazon Location Service enabled
@@ -54,92 +74,389 @@ mcp = FastMCP(
     - Use the search_places tool for general search
     - Use get_place for details on a specific place
     - Use reverse_geocode for lat/lon to address
+    - Use reverse_geocode_batch for more than one point, e.g. GPS traces or photo locations
     - Use search_nearby for places near a point
     - Use search_places_open_now to find currently open places (if supported by data)
+    - Use calculate_route_matrix instead of repeated calculate_route calls for multi-stop trips
+    - Use search_along_route for places on the way between two points
+    - Use search_within_travel_time for places reachable within a travel time, instead of
+      one calculate_route per candidate
     """,
     dependencies=[
         'boto3',
+        'numpy',
+        'orjson',
         'pydantic',
     ],
+    tool_serializer=dumps,
 )
 
 
-class GeoPlacesClient:
-    """Amazon Location Service geo-places client wrapper."""
+# Dedicated pool for blocking boto3 calls so they never run on the event loop.
+# Size it to the number of AWS requests that should be in flight at once.
+AWS_EXECUTOR_WORKERS = int(os.environ.get('AWS_EXECUTOR_WORKERS', '32'))
+aws_executor = ThreadPoolExecutor(
+    max_workers=AWS_EXECUTOR_WORKERS, thread_name_prefix='aws-location'
+)
+
+# Client-side AIMD concurrency limit per API in front of the executor, see throttle.py.
+# Calls that cannot start within the deadline are rejected instead of queueing forever.
+AWS_CALL_DEADLINE_SECONDS = float(os.environ.get('AWS_CALL_DEADLINE_SECONDS', '10'))
+aws_limiters = LimiterRegistry(
+    initial_limit=float(os.environ.get('AWS_LIMIT_INITIAL', '8')),
+    max_limit=float(os.environ.get('AWS_LIMIT_MAX', str(AWS_EXECUTOR_WORKERS))),
+)
+
+# Error codes that mean the credentials behind the shared session went stale
+EXPIRED_CREDENTIAL_CODES = {'ExpiredToken', 'ExpiredTokenException', 'RequestExpired'}
+
+# Error codes of a region that is overloaded or failing, worth trying elsewhere
+REGIONAL_ERROR_CODES = THROTTLING_CODES | {
+    'InternalServerException',
+    'ServiceUnavailable',
+    'ServiceUnavailableException',
+}
+
+# With more than one region in AWS_REGIONS, calls go to the best ranked region and
+# are hedged to the next one when they run past the recent latency percentile of
+# their API, see regions.py. The first region is preferred until stats exist.
+AWS_REGIONS = [
+    region.strip()
+    for region in os.environ.get('AWS_REGIONS', os.environ.get('AWS_REGION', 'us-east-1')).split(',')
+    if region.strip()
+]
+region_router = RegionRouter(
+    AWS_REGIONS,
+    hedge_percentile=float(os.environ.get('AWS_HEDGE_PERCENTILE', '0.95')),
+    initial_hedge_delay=float(os.environ.get('AWS_HEDGE_DELAY_SECONDS', '1.0')),
+    hedge_budget=float(os.environ.get('AWS_HEDGE_BUDGET', '0.1')),
+)
+
+
+class GeoClientRegistry:
+    """Shared, thread-safe registry of Amazon Location boto3 clients.
+
+    All clients come from one boto3 session, so credentials are resolved once and
+    each service keeps a single connection pool sized for the AWS executor. With the
+    default credential chain (profiles, SSO, instance roles) botocore refreshes
+    credentials on its own; static keys from the environment are re-read after
+    invalidate().
+    """
+
+    def __init__(self, max_pool_connections: int = AWS_EXECUTOR_WORKERS):
+        """Initialize an empty registry, clients are built on first use."""
+        self.aws_region = AWS_REGIONS[0]
+        self.max_pool_connections = max_pool_connections
+        self.config = None
+        self._lock = threading.Lock()
+        self._session = None
+        self._clients = {}
 
-    def __init__(self):
-        """Initialize the Amazon geo-places client."""
-        self.aws_region = os.environ.get('AWS_REGION', 'us-east-1')
-        self.geo_places_client = None
-        config = botocore.config.Config(
-            connect_timeout=15, read_timeout=15, retries={'max_attempts': 3}
+    def _client_config(self):
+        import botocore.config
+
+        return botocore.config.Config(
+            connect_timeout=15,
+            read_timeout=15,
+            # Standard mode spreads retries with jittered backoff instead of the
+            # legacy fixed schedule, so throttled callers do not retry in lockstep
+            retries={'max_attempts': 3, 'mode': 'standard'},
+            max_pool_connections=self.max_pool_connections,
         )
+
+    def _new_session(self):
+        import boto3
+
         aws_access_key = os.environ.get('AWS_ACCESS_KEY_ID')
         aws_secret_key = os.environ.get('AWS_SECRET_ACCESS_KEY')
         aws_session_token = os.environ.get('AWS_SESSION_TOKEN')
-        try:
-            if aws_access_key and aws_secret_key:
-                client_args = {
-                    'aws_access_key_id': aws_access_key,
-                    'aws_secret_access_key': aws_secret_key,
-                    'region_name': self.aws_region,
-                    'config': config,
-                }
-                if aws_session_token:
-                    client_args['aws_session_token'] = aws_session_token
-                self.geo_places_client = boto3.client('geo-places', **client_args)
-            else:
-                self.geo_places_client = boto3.client(
-                    'geo-places', region_name=self.aws_region, config=config
+        if aws_access_key and aws_secret_key:
+            return boto3.session.Session(
+                aws_access_key_id=aws_access_key,
+                aws_secret_access_key=aws_secret_key,
+                aws_session_token=aws_session_token,
+                region_name=self.aws_region,
+            )
+        return boto3.session.Session(region_name=self.aws_region)
+
+    def client(self, service: str, region: str = None):
+        """Return the shared client for a service in a region, creating it on first use.
+
+        region defaults to the first configured region.
+        """
+        key = (service, region or self.aws_region)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            if key not in self._clients:
+                if geo_stub.stub_enabled():
+                    self._clients[key] = geo_stub.StubGeoClient.from_env(service, key[1])
+                    logger.warning(f'Using the offline {service} stub for {key[1]}, no AWS calls are made')
+                    return self._clients[key]
+                if self._session is None:
+                    self._session = self._new_session()
+                if self.config is None:
+                    self.config = self._client_config()
+                self._clients[key] = self._session.client(
+                    service, region_name=key[1], config=self.config
                 )
-            logger.debug(f'Amazon geo-places client initialized for region {self.aws_region}')
+                logger.debug(f'Amazon {service} client initialized for region {key[1]}')
+            return self._clients[key]
+
+    def get(self, service: str):
+        """Like client() but logs and returns None when the client cannot be built."""
+        try:
+            return self.client(service)
         except Exception as e:
-            logger.error(f'Failed to initialize Amazon geo-places client: {str(e)}')
-            self.geo_places_client = None
+            logger.error(f'Failed to initialize Amazon {service} client: {str(e)}')
+            return None
+
+    def register(self, service: str, client, region: str = None):
+        """Install a ready-made client for a service, e.g. a stub."""
+        with self._lock:
+            self._clients[(service, region or self.aws_region)] = client
+
+    def invalidate(self):
+        """Drop the session and all clients so credentials are resolved again."""
+        with self._lock:
+            self._session = None
+            self._clients = {}
+
+
+class GeoPlacesClient:
+    """Amazon Location Service geo-places client wrapper."""
+
+    def __init__(self, registry: GeoClientRegistry):
+        """Initialize the wrapper, the client itself is created on first use."""
+        self.registry = registry
+        self.aws_region = registry.aws_region
+
+    @property
+    def geo_places_client(self):
+        return self.registry.get('geo-places')
 
 
 class GeoRoutesClient:
     """Amazon Location Service geo-routes client wrapper."""
 
-    def __init__(self):
-        """Initialize the Amazon geo-routes client."""
-        self.aws_region = os.environ.get('AWS_REGION', 'us-east-1')
-        self.geo_routes_client = None
-        config = botocore.config.Config(
-            connect_timeout=15, read_timeout=15, retries={'max_attempts': 3}
-        )
-        aws_access_key = os.environ.get('AWS_ACCESS_KEY_ID')
-        aws_secret_key = os.environ.get('AWS_SECRET_ACCESS_KEY')
-        aws_session_token = os.environ.get('AWS_SESSION_TOKEN')
-        try:
-            if aws_access_key and aws_secret_key:
-                client_args = {
-                    'aws_access_key_id': aws_access_key,
-                    'aws_secret_access_key': aws_secret_key,
-                    'region_name': self.aws_region,
-                    'config': config,
-                }
-                if aws_session_token:
-                    client_args['aws_session_token'] = aws_session_token
-                self.geo_routes_client = boto3.client('geo-routes', **client_args)
-            else:
-                self.geo_routes_client = boto3.client(
-                    'geo-routes', region_name=self.aws_region, config=config
-                )
-            logger.debug(f'Amazon geo-routes client initialized for region {self.aws_region}')
-        except Exception as e:
-            logger.error(f'Failed to initialize Amazon geo-routes client: {str(e)}')
-            self.geo_routes_client = None
+    def __init__(self, registry: GeoClientRegistry):
+        """Initialize the wrapper, the client itself is created on first use."""
+        self.registry = registry
+        self.aws_region = registry.aws_region
+
+    @property
+    def geo_routes_client(self):
+        return self.registry.get('geo-routes')
+
+
+def _regional_error(error) -> bool:
+    """Whether an error says more about the region than about the request."""
+    if isinstance(error, botocore.exceptions.ClientError):
+        status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        return error.response.get('Error', {}).get('Code') in REGIONAL_ERROR_CODES or status >= 500
+    return isinstance(error, botocore.exceptions.BotoCoreError)
+
+
+async def _timed_aws_call(service: str, operation: str, params: dict, region: str = None):
+    """Run one boto3 operation on the AWS executor, recording its latency and outcome.
+
+    The call first waits for a slot from the API's adaptive limiter and is rejected
+    with a ThrottlingException if none frees up within AWS_CALL_DEADLINE_SECONDS.
+    """
+    loop = asyncio.get_running_loop()
+    region = region or client_registry.aws_region
+    method = getattr(client_registry.client(service, region), operation)
+    api = f'{service}:{operation}'
+    limiter = aws_limiters.get(f'{region}/{api}' if region_router.multi_region else api)
+    started_at = await limiter.acquire(time.monotonic() + AWS_CALL_DEADLINE_SECONDS, operation)
+    start = time.perf_counter()
+    future = loop.run_in_executor(aws_executor, functools.partial(method, **params))
+
+    def finish(done, adapt=True):
+        """Record the outcome of the finished call and hand its slot back to the limiter."""
+        seconds = time.perf_counter() - start
+        error = None if done.cancelled() else done.exception()
+        throttled = False
+        if isinstance(error, botocore.exceptions.ClientError):
+            code = error.response.get('Error', {}).get('Code', 'ClientError')
+            throttled = code in THROTTLING_CODES
+            metrics.observe_aws(service, operation, seconds, code)
+        elif error is not None:
+            metrics.observe_aws(service, operation, seconds, type(error).__name__)
+        else:
+            metrics.observe_aws(service, operation, seconds)
+        region_router.observe(region, api, seconds, error is not None and _regional_error(error))
+        limiter.release(started_at, throttled, adapt=adapt)
+
+    try:
+        response = await asyncio.shield(future)
+    except asyncio.CancelledError:
+        # The boto3 call keeps running on its executor thread: hold the slot until it
+        # ends, and keep the abandoned call out of the limit's adaptation
+        future.add_done_callback(functools.partial(finish, adapt=False))
+        raise
+    except BaseException:
+        finish(future)
+        raise
+    finish(future)
+    return response
+
+
+async def _call_region(service: str, operation: str, params: dict, region: str = None):
+    """Call one region, refreshing expired credentials once."""
+    try:
+        return await _timed_aws_call(service, operation, params, region)
+    except botocore.exceptions.ClientError as e:
+        if e.response.get('Error', {}).get('Code') not in EXPIRED_CREDENTIAL_CODES:
+            raise
+        logger.warning(f'AWS credentials expired, refreshing {service} client')
+        client_registry.invalidate()
+        return await _timed_aws_call(service, operation, params, region)
+
+
+def _discard_outcome(task):
+    """Done callback for a hedged call nobody waits for any more."""
+    if not task.cancelled():
+        task.exception()
+
+
+async def _hedged_call(service: str, operation: str, params: dict):
+    """Call the best ranked region, hedging to the next when it is slow or failing.
 
+    The first successful response wins. The slower calls are left to finish on
+    their own, so their latency still counts in the region stats.
+    """
+    api = f'{service}:{operation}'
+    regions = region_router.ranked()
+    if params.get('NextToken'):
+        # Pagination tokens are only honoured by the region that issued them
+        region = next_token_regions.get(params['NextToken']) or regions[0]
+        return await _call_region(service, operation, params, region)
+    region_router.start_call()
+    backups = regions[1:]
+    calls = {}
+
+    def send(region):
+        calls[asyncio.ensure_future(_call_region(service, operation, params, region))] = region
+
+    send(regions[0])
+    timeout = region_router.hedge_delay(regions[0], api)
+    error = None
+    try:
+        while calls:
+            done, _ = await asyncio.wait(
+                calls, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                # Slower than the region usually is: hedge once, then wait for either
+                timeout = None
+                if backups and region_router.try_hedge(backups[0]):
+                    logger.debug(f'Hedging {api} from {regions[0]} to {backups[0]}')
+                    send(backups.pop(0))
+                continue
+            for task in done:
+                region = calls.pop(task)
+                if task.exception() is None:
+                    response = task.result()
+                    if region != regions[0]:
+                        region_router.hedge_won(region)
+                    if response.get('NextToken'):
+                        next_token_regions.set(response['NextToken'], region)
+                    return response
+                error = task.exception()
+                if not _regional_error(error):
+                    raise error
+            if not calls and backups:
+                logger.warning(f'{api} failed in {region}, failing over to {backups[0]}: {error}')
+                send(backups.pop(0))
+        raise error
+    finally:
+        for task in calls:
+            task.add_done_callback(_discard_outcome)
+
+
+async def call_aws(service: str, operation: str, **params):
+    """Run a blocking boto3 operation on the AWS executor and await its result.
+
+    Expired credentials invalidate the shared session once and the call is retried
+    with freshly resolved credentials. With several regions configured the call is
+    hedged across them.
+    """
+    if region_router.multi_region:
+        return await _hedged_call(service, operation, params)
+    return await _call_region(service, operation, params)
+
+
+# Shared registry behind every Amazon Location call
+client_registry = GeoClientRegistry()
+
+# Region that issued each pagination token, so the next page is asked of the same one
+next_token_regions = TTLCache('next_token_region', max_entries=10000, ttl_seconds=3600)
 
 # Initialize the geo-places client
-geo_places_client = GeoPlacesClient()
+geo_places_client = GeoPlacesClient(client_registry)
 
 # Initialize the geo-routes client
-geo_routes_client = GeoRoutesClient()
+geo_routes_client = GeoRoutesClient(client_registry)
+
+
+# Reverse geocoding results are cached per geohash cell, so repeat lookups of nearly
+# identical GPS points are answered without calling AWS. Precision 8 cells are about
+# 38 x 19 m; lower the precision to trade address accuracy for more cache hits.
+REVERSE_GEOCODE_GEOHASH_PRECISION = int(os.environ.get('REVERSE_GEOCODE_GEOHASH_PRECISION', '8'))
+reverse_geocode_cache = TTLCache(
+    'reverse_geocode',
+    max_entries=int(os.environ.get('REVERSE_GEOCODE_CACHE_SIZE', '10000')),
+    ttl_seconds=float(os.environ.get('REVERSE_GEOCODE_CACHE_TTL', '86400')),
+)
+
+
+def _summarize_reverse_geocode(response):
+    """Build the reverse_geocode result from a ReverseGeocode response, None if empty."""
+    items = response.get('ResultItems')
+    if items:
+        place = items[0]
+        point = place.get('Position') or [0, 0]
+    else:
+        place = response.get('Place', {})
+        point = place.get('Geometry', {}).get('Point', [0, 0])
+    if not place:
+        return None
+    return {
+        'name': place.get('Label') or place.get('Title', 'Unknown'),
+        'coordinates': {
+            'longitude': point[0],
+            'latitude': point[1],
+        },
+        'categories': [cat.get('Name') for cat in place.get('Categories', [])],
+        'address': place.get('Address', {}).get('Label', ''),
+    }
+
+
+def reverse_geocode_cell(longitude, latitude):
+    """Geohash cell a point is cached under; points in the same cell share one result."""
+    return geohash_encode(longitude, latitude, REVERSE_GEOCODE_GEOHASH_PRECISION)
+
+
+async def _reverse_geocode(longitude, latitude, cell=None):
+    """Reverse geocode one point through the cache, raising AWS errors."""
+    cache_key = cell or reverse_geocode_cell(longitude, latitude)
+    cached = reverse_geocode_cache.get(cache_key)
+    if cached is not None:
+        logger.debug(f'Reverse geocode cache hit for cell {cache_key}')
+        return cached
+    response = await call_aws('geo-places', 'reverse_geocode', QueryPosition=[longitude, latitude])
+    result = _summarize_reverse_geocode(response)
+    if result is None:
+        return {'raw_response': response}
+    reverse_geocode_cache.set(cache_key, result)
+    logger.debug(f'Reverse geocoded address for coordinates: {longitude}, {latitude}')
+    return result
 
 
 @mcp.tool()
+@metrics.instrument_tool
 async def reverse_geocode(
     #ctx: Context,
     longitude: float = Field(description='Longitude of the location'),
@@ -173,7 +490,8 @@ async def reverse_geocode(
     
     Note: This tool is useful for converting GPS coordinates into meaningful addresses
     and location information. It's commonly used with data from GPS devices, mobile
-    applications, or mapping services.
+    applications, or mapping services. Results are cached per ~40 m cell, so repeated
+    lookups of nearby points return immediately.
     """
     if not geo_places_client.geo_places_client:
         error_msg = 'AWS geo-places client not initialized'
@@ -182,24 +500,7 @@ async def reverse_geocode(
         return {'error': error_msg}
     logger.debug(f'Reverse geocoding for longitude: {longitude}, latitude: {latitude}')
     try:
-        response = geo_places_client.geo_places_client.reverse_geocode(
-            QueryPosition=[longitude, latitude]
-        )
-        print(f'reverse_geocode raw response: {response}')
-        place = response.get('Place', {})
-        if not place:
-            return {'raw_response': response}
-        result = {
-            'name': place.get('Label') or place.get('Title', 'Unknown'),
-            'coordinates': {
-                'longitude': place.get('Geometry', {}).get('Point', [0, 0])[0],
-                'latitude': place.get('Geometry', {}).get('Point', [0, 0])[1],
-            },
-            'categories': [cat.get('Name') for cat in place.get('Categories', [])],
-            'address': place.get('Address', {}).get('Label', ''),
-        }
-        logger.debug(f'Reverse geocoded address for coordinates: {longitude}, {latitude}')
-        return result
+        return await _reverse_geocode(longitude, latitude)
     except botocore.exceptions.ClientError as e:
         error_msg = f'AWS geo-places Service error: {str(e)}'
         logger.error(error_msg)
@@ -212,7 +513,355 @@ async def reverse_geocode(
         return {'error': error_msg}
 
 
+# reverse_geocode_batch limits: points per call, AWS requests in flight at once and
+# how often a throttled lookup is retried. Retries back off exponentially with jitter
+# and pause every worker of the batch, not just the one that was throttled.
+REVERSE_GEOCODE_BATCH_MAX_POINTS = int(os.environ.get('REVERSE_GEOCODE_BATCH_MAX_POINTS', '10000'))
+REVERSE_GEOCODE_BATCH_CONCURRENCY = int(os.environ.get('REVERSE_GEOCODE_BATCH_CONCURRENCY', '16'))
+REVERSE_GEOCODE_BATCH_MAX_RETRIES = int(os.environ.get('REVERSE_GEOCODE_BATCH_MAX_RETRIES', '5'))
+THROTTLE_BACKOFF_SECONDS = 0.2
+
+
+def _batch_cell(position):
+    """Cache cell of a [longitude, latitude] batch entry, None when it is not a valid point."""
+    try:
+        longitude, latitude = float(position[0]), float(position[1])
+    except (TypeError, ValueError, IndexError, KeyError):
+        return None, None
+    if not (-180 <= longitude <= 180 and -90 <= latitude <= 90):
+        return None, None
+    return reverse_geocode_cell(longitude, latitude), (longitude, latitude)
+
+
 @mcp.tool()
+@metrics.instrument_tool
+async def reverse_geocode_batch(
+    positions: list = Field(description='Points to reverse geocode, each as [longitude, latitude]'),
+    max_concurrency: int = Field(
+        default=REVERSE_GEOCODE_BATCH_CONCURRENCY,
+        description='Maximum number of AWS lookups in flight at once',
+        ge=1,
+        le=64,
+    ),
+) -> dict:
+    """Converts many coordinates into addresses in one call, e.g. a GPS trace or photo locations.
+
+    Use this tool instead of repeated reverse_geocode calls whenever there is more than
+    one point. Points that fall into the same ~40 m cell are looked up once, cached
+    cells are answered without calling AWS, and the remaining lookups run concurrently.
+
+    Input Parameters:
+    - positions: List of [longitude, latitude] points (up to 10000 per call)
+    - max_concurrency: Maximum number of lookups in flight at once (default: 16)
+
+    Returns:
+    A dictionary containing:
+    - results: One entry per input point, in input order, shaped like the reverse_geocode
+      result (name, coordinates, categories, address) or {'error': ...} for that point
+    - unique_cells: Number of distinct cells that were looked up
+    - throttled_retries: Number of lookups retried after AWS throttling
+
+    Example Usage:
+    reverse_geocode_batch(positions=[[-122.3321, 47.6062], [-122.3493, 47.6205]])
+    """
+    if not geo_places_client.geo_places_client:
+        error_msg = 'AWS geo-places client not initialized'
+        logger.error(error_msg)
+        return {'error': error_msg}
+    if len(positions) > REVERSE_GEOCODE_BATCH_MAX_POINTS:
+        return {'error': f'At most {REVERSE_GEOCODE_BATCH_MAX_POINTS} positions per call'}
+
+    cells = []
+    points_by_cell = {}
+    for position in positions:
+        cell, point = _batch_cell(position)
+        cells.append(cell)
+        if cell is not None:
+            points_by_cell.setdefault(cell, point)
+
+    loop = asyncio.get_running_loop()
+    results_by_cell = {}
+    pending = iter(points_by_cell.items())
+    resume_at = 0.0
+    throttled_retries = 0
+
+    async def worker():
+        nonlocal resume_at, throttled_retries
+        for cell, (longitude, latitude) in pending:
+            for attempt in range(REVERSE_GEOCODE_BATCH_MAX_RETRIES + 1):
+                delay = resume_at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                try:
+                    results_by_cell[cell] = await _reverse_geocode(longitude, latitude, cell)
+                    break
+                except botocore.exceptions.ClientError as e:
+                    code = e.response.get('Error', {}).get('Code')
+                    if code not in THROTTLING_CODES or attempt == REVERSE_GEOCODE_BATCH_MAX_RETRIES:
+                        results_by_cell[cell] = {'error': f'AWS geo-places Service error: {str(e)}'}
+                        break
+                    throttled_retries += 1
+                    backoff = THROTTLE_BACKOFF_SECONDS * 2**attempt * random.uniform(0.5, 1.0)
+                    resume_at = max(resume_at, loop.time() + backoff)
+                except Exception as e:
+                    results_by_cell[cell] = {'error': f'Error in reverse geocoding: {str(e)}'}
+                    break
+
+    workers = min(max_concurrency, len(points_by_cell))
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    invalid = {'error': 'Invalid position, expected [longitude, latitude]'}
+    return {
+        'results': [results_by_cell[cell] if cell is not None else invalid for cell in cells],
+        'unique_cells': len(points_by_cell),
+        'throttled_retries': throttled_retries,
+    }
+
+
+class RadiusHints:
+    """Remembers, per category and area, the largest search radius that found nothing.
+
+    Areas are geohash cells (precision 6, about 1.2 x 0.6 km). Knowing that nothing
+    matched within a radius of a point in the cell, search_nearby skips the tiers that
+    are certain to come back empty for any point in the same cell, the recorded radius
+    less the cell's diagonal. Only empty tiers are skipped, so a search never starts
+    above the caller's radius while that radius could still have results. Entries
+    expire after ttl_seconds, since places open and close.
+    """
+
+    # Largest distance between two points of a precision 6 cell
+    CELL_DIAGONAL_METERS = 1400
+
+    def __init__(self, precision: int = 6, ttl_seconds: float = 3600.0, max_entries: int = 10000):
+        """Initialize an empty hint table."""
+        self.precision = precision
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._hints = OrderedDict()
+
+    def _key(self, category, longitude, latitude):
+        return (category or '*', geohash_encode(longitude, latitude, self.precision))
+
+    def empty_radius(self, category, longitude, latitude):
+        """Return the radius in meters known to have no places here, or None if unknown."""
+        key = self._key(category, longitude, latitude)
+        hint = self._hints.get(key)
+        if hint is None:
+            return None
+        radius, recorded_at = hint
+        if time.monotonic() - recorded_at > self.ttl_seconds:
+            del self._hints[key]
+            return None
+        self._hints.move_to_end(key)
+        return radius - self.CELL_DIAGONAL_METERS
+
+    def record_empty(self, category, longitude, latitude, radius):
+        """Record that a search of radius around this point found no places."""
+        key = self._key(category, longitude, latitude)
+        self._hints.pop(key, None)
+        self._hints[key] = (radius, time.monotonic())
+        if len(self._hints) > self.max_entries:
+            self._hints.popitem(last=False)
+
+    def record_found(self, category, longitude, latitude, radius):
+        """Drop an empty radius that a search of this area has since contradicted."""
+        key = self._key(category, longitude, latitude)
+        hint = self._hints.get(key)
+        if hint is not None and hint[0] >= radius:
+            del self._hints[key]
+
+
+radius_hints = RadiusHints()
+
+# Places returned by search_nearby, reused for repeat queries over the same area
+place_index = PlaceIndex(
+    ttl_seconds=float(os.environ.get('PLACE_INDEX_TTL', '300')),
+    max_places=int(os.environ.get('PLACE_INDEX_MAX_PLACES', '50000')),
+)
+
+SEARCH_NEARBY_STRATEGIES = ('expand', 'concurrent', 'single')
+
+
+def radius_tiers(start_radius, max_radius, expansion_factor):
+    """Radii probed by search_nearby: start_radius grown by expansion_factor up to max_radius."""
+    tiers = []
+    current_radius = start_radius
+    while current_radius <= max_radius:
+        tiers.append(int(current_radius))
+        current_radius *= expansion_factor
+    return tiers
+
+
+async def _search_nearby_page(
+    longitude, latitude, radius, max_results, query, next_token=None, features=()
+):
+    """Run one geo-places SearchNearby call, returning its result items and NextToken.
+
+    features are AdditionalFeatures to request, e.g. Contact for contacts and opening
+    hours or TimeZone for the time zone of each place.
+    """
+    params = {
+        'QueryPosition': [longitude, latitude],
+        'MaxResults': max_results,
+        'QueryRadius': int(radius),
+    }
+    if query:
+        params['Filter'] = {'IncludeCategories': [query]}
+    if features:
+        params['AdditionalFeatures'] = list(features)
+    if next_token:
+        params['NextToken'] = next_token
+    response = await call_aws('geo-places', 'search_nearby', **params)
+    items = response.get('ResultItems', [])
+    _warm_place_details(items)
+    if not next_token:
+        place_index.add_region(
+            query,
+            longitude,
+            latitude,
+            radius,
+            items,
+            complete=not response.get('NextToken') and len(items) < max_results,
+            features=features,
+        )
+    return items, response.get('NextToken')
+
+
+async def _search_nearby_items(longitude, latitude, radius, max_results, query, features=()):
+    """Run one geo-places SearchNearby call and return its result items."""
+    items, _ = await _search_nearby_page(
+        longitude, latitude, radius, max_results, query, features=features
+    )
+    return items
+
+
+# next_token values of pages served from the place index carry an offset into the
+# distance-ranked local results instead of an AWS NextToken
+LOCAL_CURSOR_PREFIX = 'local:'
+
+
+def _local_cursor(offset):
+    return f'{LOCAL_CURSOR_PREFIX}{offset}'
+
+
+async def _resume_local(longitude, latitude, radius, max_results, query, offset):
+    """Next page of a search answered locally, from offset in the distance-ranked places.
+
+    The place index answers while it still covers the radius. Otherwise the first
+    offset + max_results places are fetched from AWS, with a last page that ends where
+    this page ends, so its NextToken continues the results.
+    """
+    local_items = place_index.query(query, longitude, latitude, radius)
+    if local_items is not None:
+        end = offset + max_results
+        return local_items[offset:end], _local_cursor(end) if len(local_items) > end else None
+    items, next_page = [], None
+    while True:
+        wanted = min(50, offset + max_results - len(items))
+        page, next_page = await _search_nearby_page(
+            longitude, latitude, radius, wanted, query, next_page
+        )
+        items.extend(page)
+        if not next_page or len(items) >= offset + max_results:
+            return items[offset:], next_page
+
+
+async def _probe_expanding(longitude, latitude, tiers, max_results, query):
+    """Probe radius tiers one after another, stopping at the first non-empty tier."""
+    for tier in tiers:
+        items, next_token = await _search_nearby_page(
+            longitude, latitude, tier, max_results, query
+        )
+        if items:
+            return items, tier, next_token
+    return [], None, None
+
+
+async def _probe_concurrent(longitude, latitude, tiers, max_results, query):
+    """Probe all radius tiers at once and keep the smallest non-empty one.
+
+    Returns as soon as a tier has results and every smaller tier came back empty;
+    larger tiers still in flight are cancelled.
+    """
+    tasks = [
+        asyncio.ensure_future(
+            _search_nearby_page(longitude, latitude, tier, max_results, query)
+        )
+        for tier in tiers
+    ]
+    try:
+        for tier, task in zip(tiers, tasks):
+            items, next_token = await task
+            if items:
+                return items, tier, next_token
+        return [], None, None
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _probe_single(longitude, latitude, tiers, max_results, query):
+    """Query the largest tier once and cut the results down to the smallest tier locally."""
+    items, next_token = await _search_nearby_page(
+        longitude, latitude, tiers[-1], max_results, query
+    )
+
+    def distance(item):
+        if item.get('Distance') is not None:
+            return item['Distance']
+        position = item.get('Position') or [longitude, latitude]
+        return haversine_meters(longitude, latitude, position[0], position[1])
+
+    ranked = sorted(((distance(item), item) for item in items), key=lambda pair: pair[0])
+    for tier in tiers:
+        within = [item for item_distance, item in ranked if item_distance <= tier]
+        if within:
+            if len(within) < len(ranked) or not next_token:
+                # Places beyond the tier came back too, so the tier is complete
+                return within, tier, None
+            # The NextToken pages the max-radius query, not this tier; resume by offset
+            return within, tier, _local_cursor(len(within))
+    return [], None, None
+
+
+SEARCH_NEARBY_PROBES = {
+    'expand': _probe_expanding,
+    'concurrent': _probe_concurrent,
+    'single': _probe_single,
+}
+
+
+DEFAULT_PLACE_FIELDS = (
+    'place_id',
+    'name',
+    'address',
+    'coordinates',
+    'distance_meters',
+    'categories',
+)
+
+
+def _summarize_nearby_items(items, mode, fields=DEFAULT_PLACE_FIELDS, origin=None):
+    """Convert geo-places result items into the search_nearby output format.
+
+    Only the requested fields are built. distance_meters is measured from origin, a
+    (longitude, latitude) pair, when given and taken from the AWS result otherwise.
+    """
+    if mode == 'raw':
+        return list(items)
+    return [Place.from_item(item, origin, fields).to_dict(fields) for item in items]
+
+
+def _check_fields(fields, default):
+    """Resolve a fields argument, returning (fields, error message or None)."""
+    fields = tuple(fields) if fields else default
+    unknown_fields = set(fields) - set(PLACE_FIELDS)
+    if unknown_fields:
+        return fields, f'Unknown fields {sorted(unknown_fields)}, expected any of {PLACE_FIELDS}'
+    return fields, None
+
+
+@mcp.tool()
+@metrics.instrument_tool
 async def search_nearby(
     #ctx: Context,
     longitude: float = Field(description='Longitude of the center point'),
@@ -222,19 +871,34 @@ async def search_nearby(
     ),
     query: Optional[str] = Field(default=None, description='Optional search query'),
     radius: int = Field(default=500, description='Search radius in meters', ge=1, le=50000),
+    strategy: str = Field(
+        default='expand',
+        description="Radius search strategy: 'expand' (grow the radius one query at a time), "
+        "'concurrent' (query all radii at once) or 'single' (one max-radius query ranked by distance)",
+    ),
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description='Fields to return per place, any of place_id, name, address, coordinates, '
+        'distance_meters, categories, contacts, opening_hours. Defaults to all but contacts '
+        'and opening_hours',
+    ),
+    next_token: Optional[str] = Field(
+        default=None,
+        description='next_token from a previous search_nearby response to fetch the next page',
+    ),
 ) -> Dict:
     """Finds places within a specified radius of a geographic point using Amazon Location Service.
     
     This tool searches for nearby places around a center point, automatically expanding the
-    search radius if needed to find results. It returns detailed information about each
-    nearby place including:
+    search radius if needed to find results. It returns information about each nearby
+    place including:
     - Place name and unique ID
     - Full address
     - Geographic coordinates
     - Distance from search point
     - Business categories
-    - Contact details (phones, websites, emails, faxes)
-    - Operating hours
+    - Contact details (phones, websites, emails, faxes), only when requested in fields
+    - Operating hours, only when requested in fields
     
     Input Parameters:
     - longitude: Center point longitude (-180 to +180)
@@ -242,16 +906,27 @@ async def search_nearby(
     - max_results: Number of places to return (default=5, max=50)
     - query: Optional text to filter results (e.g., "restaurant", "park"), convert the input to all lower case and have _ for all spaces 
     - radius: Initial search radius in meters (default=50000, max=50000)
+    - strategy: How the radius is expanded when nothing is found:
+        * 'expand' (default) - one query per radius, doubling until results are found
+        * 'concurrent' - all radii queried at once, the smallest radius with results wins
+        * 'single' - one query at the maximum radius, results cut to the smallest radius locally
+    - fields: Optional list of fields to return per place. Defaults to place_id, name,
+      address, coordinates, distance_meters and categories; add "contacts" or
+      "opening_hours" only when you need phone numbers, websites or hours
+    - next_token: Pass the next_token of a previous response, with the same query and
+      radius set to its radius_used, to fetch the next page of results
     
     Advanced Features:
     - Automatic radius expansion if no results found (up to 10km)
     - Progressive search with 2x expansion factor
-    - Standardized output format with all fields included
+    - Skips radii that a recent search of the same category near the point found empty
+    - Repeat searches over an area fetched in the last few minutes are answered locally
     
     Returns:
     A dictionary containing:
-    - places: List of nearby places with detailed information
+    - places: List of nearby places with the requested fields
     - radius_used: The actual search radius that returned results
+    - next_token: Present when more results are available at radius_used
     - error: Error message if the search fails
     
     Example Usage:
@@ -269,7 +944,6 @@ async def search_nearby(
     """
     #print("In snb")
     # Moved from parameters to local variables
-    max_results = 50  # Maximum number of results to return
     max_radius = 50000  # Maximum search radius in meters for expansion
     expansion_factor = 2.0  # Factor to expand radius by if no results
     mode = 'summary'  # Output mode: 'summary' (default) or 'raw' for all AWS fields
@@ -282,98 +956,432 @@ async def search_nearby(
         error_msg = 'AWS geo-places client not initialized'
         #await ctx.error(error_msg)
         return {'error': error_msg}
+    if strategy not in SEARCH_NEARBY_PROBES:
+        return {'error': f'Unknown strategy {strategy!r}, expected one of {SEARCH_NEARBY_STRATEGIES}'}
+    fields, error_msg = _check_fields(fields, DEFAULT_PLACE_FIELDS)
+    if error_msg:
+        return {'error': error_msg}
+    origin = (longitude, latitude)
+
+    def response(items, radius_used, next_page=None):
+        result = {
+            'places': _summarize_nearby_items(items, mode, fields, origin),
+            'radius_used': radius_used,
+        }
+        if next_page:
+            result['next_token'] = next_page
+        return result
+
     try:
-        current_radius = radius
-        while current_radius <= max_radius:
-            params = {
-                'QueryPosition': [longitude, latitude],
-                'MaxResults': max_results,
-                'QueryRadius': int(current_radius),
-                'Filter':{
-                    "IncludeCategories" : [query]
-                } 
-            }
-            print(params)
-            response = geo_places_client.geo_places_client.search_nearby(**params)
-            items = response.get('ResultItems', [])
-            results = []
-            for item in items:
-                if mode == 'raw':
-                    results.append(item)
-                else:
-                    contacts = {
-                        'phones': [p['Value'] for p in item.get('Contacts', {}).get('Phones', [])]
-                        if item.get('Contacts')
-                        else [],
-                        'websites': [
-                            w['Value'] for w in item.get('Contacts', {}).get('Websites', [])
-                        ]
-                        if item.get('Contacts')
-                        else [],
-                        'emails': [e['Value'] for e in item.get('Contacts', {}).get('Emails', [])]
-                        if item.get('Contacts')
-                        else [],
-                        'faxes': [f['Value'] for f in item.get('Contacts', {}).get('Faxes', [])]
-                        if item.get('Contacts')
-                        else [],
-                    }
-
-                    def parse_opening_hours(result):
-                        oh = result.get('OpeningHours')
-                        if not oh:
-                            contacts = result.get('Contacts', {})
-                            oh = contacts.get('OpeningHours') if contacts else None
-                        if not oh:
-                            return []
-                        if isinstance(oh, dict):
-                            oh = [oh]
-                        parsed = []
-                        for entry in oh:
-                            parsed.append(
-                                {
-                                    'display': entry.get('Display', [])
-                                    or entry.get('display', []),
-                                    'components': entry.get('Components', [])
-                                    or entry.get('components', []),
-                                    'open_now': entry.get('OpenNow', None),
-                                    'categories': [
-                                        cat.get('Name') for cat in entry.get('Categories', [])
-                                    ]
-                                    if 'Categories' in entry
-                                    else [],
-                                }
-                            )
-                        return parsed
-
-                    opening_hours = parse_opening_hours(item)
-                    results.append(
-                        {
-                            'place_id': item.get('PlaceId', 'Not available'),
-                            'name': item.get('Title', 'Not available'),
-                            'address': item.get('Address', {}).get('Label', 'Not available'),
-                            'coordinates': {
-                                'longitude': item.get('Position', [None, None])[0],
-                                'latitude': item.get('Position', [None, None])[1],
-                            },
-                            'categories': [cat.get('Name') for cat in item.get('Categories', [])]
-                            if item.get('Categories')
-                            else [],
-                            'contacts': contacts,
-                            'opening_hours': opening_hours,
-                        }
-                    )
-            if results:
-                #print(results)
-                return {'places': results, 'radius_used': current_radius}
-            current_radius *= expansion_factor
-        return {'places': [], 'radius_used': current_radius / expansion_factor}
+        if next_token and next_token.startswith(LOCAL_CURSOR_PREFIX):
+            offset = int(next_token[len(LOCAL_CURSOR_PREFIX):])
+            items, next_page = await _resume_local(
+                longitude, latitude, radius, max_results, query, offset
+            )
+            return response(items, radius, next_page)
+        if next_token:
+            items, next_page = await _search_nearby_page(
+                longitude, latitude, radius, max_results, query, next_token
+            )
+            return response(items, radius, next_page)
+        all_tiers = tiers = radius_tiers(radius, max_radius, expansion_factor)
+        # Skip tiers a recent search near here found empty, keeping the largest one
+        empty_radius = radius_hints.empty_radius(query, longitude, latitude)
+        if empty_radius is not None:
+            while len(tiers) > 1 and tiers[0] <= empty_radius:
+                tiers = tiers[1:]
+        # Answer from places fetched earlier while the index fully covers a tier
+        while tiers:
+            local_items = place_index.query(query, longitude, latitude, tiers[0])
+            if local_items is None:
+                break
+            if local_items:
+                metrics.observe_expansion(all_tiers.index(tiers[0]), 'local')
+                next_page = (
+                    _local_cursor(max_results) if len(local_items) > max_results else None
+                )
+                return response(local_items[:max_results], tiers[0], next_page)
+            if len(tiers) == 1:
+                metrics.observe_expansion(len(all_tiers) - 1, 'empty')
+                return response([], tiers[0])
+            tiers = tiers[1:]
+        probe = SEARCH_NEARBY_PROBES[strategy]
+        items, radius_used, next_page = await probe(
+            longitude, latitude, tiers, max_results, query
+        )
+        if items:
+            metrics.observe_expansion(all_tiers.index(radius_used), 'aws')
+            position = tiers.index(radius_used)
+            if position:
+                radius_hints.record_empty(query, longitude, latitude, tiers[position - 1])
+            else:
+                radius_hints.record_found(query, longitude, latitude, radius_used)
+            return response(items[:max_results], radius_used, next_page)
+        metrics.observe_expansion(len(all_tiers) - 1, 'empty')
+        radius_hints.record_empty(query, longitude, latitude, tiers[-1])
+        return response([], tiers[-1])
     except Exception as e:
-        print(f'search_nearby error: {e}')
+        logger.error(f'search_nearby error: {e}')
         #await ctx.error(f'search_nearby error: {e}')
         return {'error': str(e)}
 
 
+# Place details are cached by PlaceId as models.Place records. Search results that carry
+# contact details warm the cache, so a follow-up get_place for a place just found is
+# answered locally.
+place_detail_cache = TTLCache(
+    'get_place',
+    max_entries=int(os.environ.get('PLACE_DETAIL_CACHE_SIZE', '10000')),
+    ttl_seconds=float(os.environ.get('PLACE_DETAIL_CACHE_TTL', '3600')),
+)
+PLACE_DETAIL_FIELDS = tuple(field for field in PLACE_FIELDS if field != 'distance_meters')
+
+
+def _warm_place_details(items):
+    """Cache the details of search result items that include contacts."""
+    for item in items:
+        if item.get('PlaceId') and 'Contacts' in item:
+            place_detail_cache.set(item['PlaceId'], Place.from_item(item))
+
+
+@mcp.tool()
+@metrics.instrument_tool
+async def search_places(
+    query: str = Field(description='Free-text search, e.g. "Space Needle" or "pizza in Ballard"'),
+    bias_position: Optional[List[float]] = Field(
+        default=None,
+        description='[longitude, latitude] to rank results around, e.g. the user location',
+    ),
+    bounding_box: Optional[List[float]] = Field(
+        default=None,
+        description='[west, south, east, north] longitudes and latitudes to search within, '
+        'instead of bias_position',
+    ),
+    countries: Optional[List[str]] = Field(
+        default=None,
+        description='ISO 3166 alpha-3 country codes to limit results to, e.g. ["USA", "CAN"]',
+    ),
+    max_results: int = Field(
+        default=5, description='Maximum number of results to return', ge=1, le=50
+    ),
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description='Fields to return per place, same choices as search_nearby. Defaults to '
+        'all but contacts and opening_hours',
+    ),
+) -> Dict:
+    """Searches for places by name, address or free text using Amazon Location Service.
+
+    Use this tool to find a specific named place or an address. Exactly one of
+    bias_position or bounding_box is required; countries only narrows the results
+    further. For places of a category around a point use search_nearby instead.
+
+    Returns:
+    A dictionary containing:
+    - places: List of places with the requested fields; distance_meters is measured
+      from bias_position when given
+    - error: Error message if the search fails
+
+    Example Usage:
+    search_places(query="Pike Place Market", bias_position=[-122.3321, 47.6062])
+
+    Follow up with get_place(place_id=...) for contacts and opening hours of a result;
+    places found here are answered from the cache.
+    """
+    if not geo_places_client.geo_places_client:
+        error_msg = 'AWS geo-places client not initialized'
+        logger.error(error_msg)
+        return {'error': error_msg}
+    if bool(bias_position) == bool(bounding_box):
+        return {'error': 'Provide exactly one of bias_position or bounding_box'}
+    if bounding_box and len(bounding_box) != 4:
+        return {'error': 'bounding_box must be [west, south, east, north]'}
+    fields, error_msg = _check_fields(fields, DEFAULT_PLACE_FIELDS)
+    if error_msg:
+        return {'error': error_msg}
+    params = {'QueryText': query, 'MaxResults': max_results, 'AdditionalFeatures': ['Contact']}
+    search_filter = {}
+    if bias_position:
+        params['BiasPosition'] = bias_position
+    else:
+        search_filter['BoundingBox'] = bounding_box
+    if countries:
+        search_filter['IncludeCountries'] = countries
+    if search_filter:
+        params['Filter'] = search_filter
+    try:
+        response = await call_aws('geo-places', 'search_text', **params)
+    except botocore.exceptions.ClientError as e:
+        error_msg = f'AWS geo-places Service error: {str(e)}'
+        logger.error(error_msg)
+        return {'error': error_msg}
+    except Exception as e:
+        error_msg = f'Error in search_places: {str(e)}'
+        logger.error(error_msg)
+        return {'error': error_msg}
+    items = response.get('ResultItems', [])
+    _warm_place_details(items)
+    origin = tuple(bias_position) if bias_position else None
+    return {'places': _summarize_nearby_items(items, 'summary', fields, origin)}
+
+
+@mcp.tool()
+@metrics.instrument_tool
+async def get_place(
+    place_id: str = Field(description='PlaceId from search_places, search_nearby or another tool'),
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description='Fields to return, any of place_id, name, address, coordinates, categories, '
+        'contacts, opening_hours. Defaults to all of them',
+    ),
+) -> Dict:
+    """Gets the details of a place by its PlaceId using Amazon Location Service.
+
+    Use this tool for the phone numbers, websites and opening hours of a place
+    returned by a search. Details are cached by PlaceId, and places from recent
+    searches are usually answered without calling AWS.
+
+    Returns:
+    A dictionary with the requested fields of the place, or error if the lookup fails.
+
+    Example Usage:
+    get_place(place_id="AQAAAFUA...", fields=["name", "contacts", "opening_hours"])
+    """
+    if not geo_places_client.geo_places_client:
+        error_msg = 'AWS geo-places client not initialized'
+        logger.error(error_msg)
+        return {'error': error_msg}
+    fields, error_msg = _check_fields(fields, PLACE_DETAIL_FIELDS)
+    if error_msg:
+        return {'error': error_msg}
+    place = place_detail_cache.get(place_id)
+    if place is None:
+        try:
+            response = await call_aws(
+                'geo-places', 'get_place', PlaceId=place_id, AdditionalFeatures=['Contact']
+            )
+        except botocore.exceptions.ClientError as e:
+            error_msg = f'AWS geo-places Service error: {str(e)}'
+            logger.error(error_msg)
+            return {'error': error_msg}
+        except Exception as e:
+            error_msg = f'Error in get_place: {str(e)}'
+            logger.error(error_msg)
+            return {'error': error_msg}
+        response.setdefault('PlaceId', place_id)
+        place = Place.from_item(response)
+        place_detail_cache.set(place_id, place)
+    return place.to_dict(field for field in fields if field in PLACE_DETAIL_FIELDS)
+
+
+OPEN_NOW_CANDIDATES = 50
+OPEN_NOW_SORT_ORDERS = ('distance', 'open_longest')
+# Opening hours only come back with Contact, and time zones with TimeZone
+OPEN_NOW_FEATURES = ('Contact', 'TimeZone')
+
+
+@mcp.tool()
+@metrics.instrument_tool
+async def search_places_open_now(
+    longitude: float = Field(description='Longitude of the center point'),
+    latitude: float = Field(description='Latitude of the center point'),
+    query: Optional[str] = Field(
+        default=None, description='Optional category, e.g. restaurant or pharmacy'
+    ),
+    at: Optional[str] = Field(
+        default=None,
+        description="Local time at the places to check instead of now, e.g. 'Saturday 21:00' "
+        "or '2025-06-07T21:00'",
+    ),
+    radius: int = Field(default=1000, description='Search radius in meters', ge=1, le=50000),
+    max_results: int = Field(
+        default=5, description='Maximum number of results to return', ge=1, le=50
+    ),
+    sort_by: str = Field(
+        default='distance',
+        description="Order of the open places: 'distance' or 'open_longest' (latest closing first)",
+    ),
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description='Fields to return per place, same choices as search_nearby. Defaults to '
+        'all but contacts and opening_hours',
+    ),
+) -> Dict:
+    """Finds places near a point that are open now or at a given local time.
+
+    Opening hours are evaluated by the server for every candidate, so use this tool
+    for questions like "which pharmacies are open at 9pm on Saturday" instead of
+    reading opening hours yourself. The radius grows until enough open places are
+    found or 50 km is reached.
+
+    Returns:
+    A dictionary containing:
+    - places: Open places with the requested fields plus closes_in_minutes
+      (10080 for places open around the clock)
+    - radius_used: Radius of the last search in meters
+    - checked: Number of candidate places evaluated
+    - unknown_hours: Number of candidates without opening hours, which are left out
+
+    Example Usage:
+    search_places_open_now(longitude=-122.3321, latitude=47.6062, query="pharmacy",
+                           at="Saturday 21:00")
+    """
+    max_radius = 50000
+    if not geo_places_client.geo_places_client:
+        error_msg = 'AWS geo-places client not initialized'
+        logger.error(error_msg)
+        return {'error': error_msg}
+    if sort_by not in OPEN_NOW_SORT_ORDERS:
+        return {'error': f'Unknown sort_by {sort_by!r}, expected one of {OPEN_NOW_SORT_ORDERS}'}
+    fields, error_msg = _check_fields(fields, DEFAULT_PLACE_FIELDS)
+    if error_msg:
+        return {'error': error_msg}
+    import numpy as np
+    import opening_hours
+
+    try:
+        at_minute = opening_hours.parse_weekly_time(at) if at else None
+    except ValueError as e:
+        return {'error': str(e)}
+
+    try:
+        for tier in radius_tiers(radius, max_radius, 2.0):
+            items = place_index.query(query, longitude, latitude, tier, OPEN_NOW_FEATURES)
+            if items is None:
+                items = await _search_nearby_items(
+                    longitude, latitude, tier, OPEN_NOW_CANDIDATES, query, OPEN_NOW_FEATURES
+                )
+            schedules = opening_hours.WeeklySchedules(items)
+            if at_minute is None:
+                now = datetime.datetime.now(datetime.timezone.utc)
+                minutes = [opening_hours.local_minute_of_week(item, now) for item in items]
+            else:
+                minutes = at_minute
+            is_open, closes_in, _ = schedules.evaluate(minutes)
+            if is_open.sum() >= max_results:
+                break
+    except Exception as e:
+        logger.error(f'search_places_open_now error: {e}')
+        return {'error': str(e)}
+
+    open_indexes = np.flatnonzero(is_open)
+    if sort_by == 'open_longest':
+        open_indexes = open_indexes[np.argsort(-closes_in[open_indexes], kind='stable')]
+    open_indexes = open_indexes[:max_results]
+    places = _summarize_nearby_items(
+        [items[index] for index in open_indexes], 'summary', fields, (longitude, latitude)
+    )
+    for place, index in zip(places, open_indexes):
+        place['closes_in_minutes'] = int(closes_in[index])
+    return {
+        'places': places,
+        'radius_used': tier,
+        'checked': len(items),
+        'unknown_hours': int((~schedules.known).sum()),
+    }
+
+
+# Routes are cached by origin and destination snapped to a grid, travel mode and
+# optimization. 0.001 degrees is roughly 100 m. Set ROUTE_CACHE_PATH to a file to keep
+# popular routes across server restarts.
+ROUTE_CACHE_GRID_DEGREES = float(os.environ.get('ROUTE_CACHE_GRID_DEGREES', '0.001'))
+route_cache = TTLCache(
+    'calculate_route',
+    max_entries=int(os.environ.get('ROUTE_CACHE_SIZE', '5000')),
+    ttl_seconds=float(os.environ.get('ROUTE_CACHE_TTL', '3600')),
+    persist_path=os.environ.get('ROUTE_CACHE_PATH') or None,
+)
+
+
+def route_cache_key(departure_position, destination_position, travel_mode, optimize_for):
+    """Cache key for a route between two snapped positions."""
+    return '|'.join(
+        (
+            travel_mode,
+            optimize_for,
+            snap_position(departure_position, ROUTE_CACHE_GRID_DEGREES),
+            snap_position(destination_position, ROUTE_CACHE_GRID_DEGREES),
+        )
+    )
+
+
+def _check_positions(positions, name):
+    """Error message if positions is not a list of numeric [longitude, latitude] pairs, else None."""
+    for index, position in enumerate(positions):
+        if (
+            not isinstance(position, (list, tuple))
+            or len(position) != 2
+            or not all(
+                isinstance(value, (int, float)) and not isinstance(value, bool)
+                for value in position
+            )
+        ):
+            return f'{name}[{index}] must be [longitude, latitude] as two numbers, got {position!r}'
+    return None
+
+
+async def _calculate_route(
+    departure_position, destination_position, travel_mode, optimize_for, include_leg_geometry=False
+):
+    """Calculate a route summary, served from the route cache when possible.
+
+    With include_leg_geometry the summary also carries 'geometry', the FlexiblePolyline
+    of each leg. AWS errors are raised; a missing route is returned as {'error': ...}.
+    """
+    cache_key = route_cache_key(departure_position, destination_position, travel_mode, optimize_for)
+    if include_leg_geometry:
+        cache_key += '|geometry'
+    cached = route_cache.get(cache_key)
+    if cached is not None:
+        logger.debug(f'Route cache hit for {cache_key}')
+        return cached
+
+    params = {
+        'Origin': departure_position,
+        'Destination': destination_position,
+        'TravelMode': travel_mode,
+        'TravelStepType': 'TurnByTurn',
+        'OptimizeRoutingFor': optimize_for,
+    }
+    if include_leg_geometry:
+        params['LegGeometryFormat'] = 'FlexiblePolyline'
+    response = await call_aws('geo-routes', 'calculate_routes', **params)
+    routes = response.get('Routes', [])
+    if not routes:
+        return {'error': 'No route found'}
+    route = routes[0]
+    summary = route.get('Summary', {})
+    distance_meters = route.get('Distance', summary.get('Distance'))
+    duration_seconds = route.get('DurationSeconds', summary.get('Duration'))
+    turn_by_turn = []
+    geometry = []
+    for leg in route.get('Legs', []):
+        vehicle_leg_details = leg.get('VehicleLegDetails', {})
+        for step in vehicle_leg_details.get('TravelSteps', []):
+            step_summary = {
+                'distance_meters': step.get('Distance'),
+                'duration_seconds': step.get('Duration'),
+                'type': step.get('Type'),
+                'road_name': step.get('NextRoad', {}).get('RoadName')
+                if step.get('NextRoad')
+                else None,
+            }
+            turn_by_turn.append(step_summary)
+        if include_leg_geometry and leg.get('Geometry', {}).get('Polyline'):
+            geometry.append(leg['Geometry']['Polyline'])
+    result = {
+        'distance_meters': distance_meters,
+        'duration_seconds': duration_seconds,
+        'turn_by_turn': turn_by_turn,
+    }
+    if include_leg_geometry:
+        result['geometry'] = geometry
+    route_cache.set(cache_key, result)
+    return result
+
+
 @mcp.tool()
+@metrics.instrument_tool
 async def calculate_route(
     #ctx: Context,
     departure_position: list = Field(description='Departure position as [longitude, latitude]'),
@@ -388,6 +1396,12 @@ async def calculate_route(
         default='FastestRoute',
         description="Optimize route for 'FastestRoute' or 'ShortestRoute' (default: 'FastestRoute')",
     ),
+    include_leg_geometry: bool = Field(
+        default=False, description='Include the simplified route line as [longitude, latitude] points'
+    ),
+    geometry_tolerance_meters: float = Field(
+        default=100, description='Maximum deviation of the simplified route line in meters', ge=0
+    ),
 ) -> dict:
     """Calculates a detailed route between two points using Amazon Location Service.
     
@@ -417,6 +1431,8 @@ async def calculate_route(
         * Duration for this step
         * Type of maneuver
         * Road name
+    - geometry: Only with include_leg_geometry, the route line as [longitude, latitude]
+        points, simplified so it stays within geometry_tolerance_meters of the real route
     - error: Error message if route calculation fails
     
     Example Usage:
@@ -427,55 +1443,492 @@ async def calculate_route(
         optimize_for="FastestRoute"
     )
     """
-    include_leg_geometry = False
-    mode = 'summary'
-    client = GeoRoutesClient().geo_routes_client
-
     # Check if client is None before proceeding
-    if client is None:
+    if geo_routes_client.geo_routes_client is None:
         return {'error': 'Failed to initialize Amazon geo-routes client'}
+    try:
+        route = await _calculate_route(
+            departure_position,
+            destination_position,
+            travel_mode,
+            optimize_for,
+            include_leg_geometry=include_leg_geometry,
+        )
+        if not include_leg_geometry or 'error' in route:
+            return route
+        import numpy as np
+        import route_geometry
 
-    params = {
-        'Origin': departure_position,
-        'Destination': destination_position,
-        'TravelMode': travel_mode,
-        'TravelStepType': 'TurnByTurn',
-        'OptimizeRoutingFor': optimize_for,
+        legs = [polyline.decode_array(encoded) for encoded in route['geometry']]
+        points = np.concatenate(legs) if legs else np.empty((0, 2))
+        simplified = route_geometry.simplify(points, geometry_tolerance_meters)
+        return {
+            **route,
+            'geometry': np.round(simplified[:, [1, 0]], 5).tolist(),
+        }
+    except Exception as e:
+        return {'error': str(e)}
+
+
+# Route matrix requests are split into chunks of at most this many origins and
+# destinations, the limits of a CalculateRouteMatrix call with unbounded routing.
+ROUTE_MATRIX_MAX_ORIGINS = int(os.environ.get('ROUTE_MATRIX_MAX_ORIGINS', '15'))
+ROUTE_MATRIX_MAX_DESTINATIONS = int(os.environ.get('ROUTE_MATRIX_MAX_DESTINATIONS', '15'))
+route_matrix_cache = TTLCache(
+    'calculate_route_matrix',
+    max_entries=int(os.environ.get('ROUTE_MATRIX_CACHE_SIZE', '50000')),
+    ttl_seconds=float(os.environ.get('ROUTE_CACHE_TTL', '3600')),
+)
+
+
+def _chunks(indexes, size):
+    return [indexes[start : start + size] for start in range(0, len(indexes), size)]
+
+
+async def _route_matrix_chunk(origins, destinations, rows, columns, travel_mode, optimize_for):
+    """Calculate one chunk of the matrix, returning ((row, column), entry) pairs."""
+    response = await call_aws(
+        'geo-routes',
+        'calculate_route_matrix',
+        Origins=[{'Position': origins[row]} for row in rows],
+        Destinations=[{'Position': destinations[column]} for column in columns],
+        TravelMode=travel_mode,
+        OptimizeRoutingFor=optimize_for,
+        RoutingBoundary={'Unbounded': True},
+    )
+    matrix = response.get('RouteMatrix', [])
+    entries = []
+    for row, matrix_row in zip(rows, matrix):
+        for column, entry in zip(columns, matrix_row):
+            entries.append(((row, column), entry))
+    return entries
+
+
+@mcp.tool()
+@metrics.instrument_tool
+async def calculate_route_matrix(
+    #ctx: Context,
+    origins: list = Field(description='Origin positions, each as [longitude, latitude]'),
+    destinations: list = Field(description='Destination positions, each as [longitude, latitude]'),
+    travel_mode: str = Field(
+        default='Car',
+        description="Travel mode: 'Car', 'Truck', 'Pedestrian' or 'Scooter' (default: 'Car')",
+    ),
+    optimize_for: str = Field(
+        default='FastestRoute',
+        description="Optimize routes for 'FastestRoute' or 'ShortestRoute' (default: 'FastestRoute')",
+    ),
+) -> dict:
+    """Calculates travel distance and time between every origin and every destination.
+
+    Use this tool instead of repeated calculate_route calls when planning multi-stop
+    trips or ordering stops: one call returns the whole origin x destination matrix.
+    Large sets are split into several service requests that run concurrently, and
+    pairs that were calculated recently are served from the cache.
+
+    Input Parameters:
+    - origins: List of starting points as [longitude, latitude]
+    - destinations: List of end points as [longitude, latitude]
+        Pass the same list as origins and destinations to get all stop-to-stop legs
+    - travel_mode: 'Car' (default), 'Truck', 'Pedestrian' or 'Scooter'
+    - optimize_for: 'FastestRoute' (default) or 'ShortestRoute'
+
+    Returns:
+    A dictionary containing:
+    - distance_meters: Matrix where [i][j] is the distance from origins[i] to destinations[j]
+    - duration_seconds: Matrix of travel times in the same layout
+    - errors: List of {origin, destination, error} for pairs that could not be routed
+    - error: Error message if the calculation fails
+
+    Example Usage:
+    calculate_route_matrix(
+        origins=[[-122.3321, 47.6062], [-122.6765, 45.5231]],
+        destinations=[[-122.6765, 45.5231], [-123.1207, 49.2827]],
+    )
+    """
+    if geo_routes_client.geo_routes_client is None:
+        return {'error': 'Failed to initialize Amazon geo-routes client'}
+    if not origins or not destinations:
+        return {'error': 'At least one origin and one destination are required'}
+    error_msg = _check_positions(origins, 'origins') or _check_positions(
+        destinations, 'destinations'
+    )
+    if error_msg:
+        return {'error': error_msg}
+
+    distances = [[None] * len(destinations) for _ in origins]
+    durations = [[None] * len(destinations) for _ in origins]
+    keys = {}
+    missing = []
+    for row, origin in enumerate(origins):
+        for column, destination in enumerate(destinations):
+            key = route_cache_key(origin, destination, travel_mode, optimize_for)
+            cached = route_matrix_cache.get(key) or route_cache.get(key)
+            if cached is None:
+                keys[(row, column)] = key
+                missing.append((row, column))
+                continue
+            distances[row][column] = cached['distance_meters']
+            durations[row][column] = cached['duration_seconds']
+
+    errors = []
+    if missing:
+        rows = sorted({row for row, _ in missing})
+        columns = sorted({column for _, column in missing})
+        chunks = [
+            _route_matrix_chunk(
+                origins, destinations, row_chunk, column_chunk, travel_mode, optimize_for
+            )
+            for row_chunk in _chunks(rows, ROUTE_MATRIX_MAX_ORIGINS)
+            for column_chunk in _chunks(columns, ROUTE_MATRIX_MAX_DESTINATIONS)
+        ]
+        try:
+            results = await asyncio.gather(*chunks)
+        except Exception as e:
+            return {'error': str(e)}
+        for entries in results:
+            for (row, column), entry in entries:
+                if entry.get('Error'):
+                    errors.append({'origin': row, 'destination': column, 'error': entry['Error']})
+                    continue
+                distances[row][column] = entry.get('Distance')
+                durations[row][column] = entry.get('Duration')
+                key = keys.get((row, column))
+                if key is not None:
+                    route_matrix_cache.set(
+                        key,
+                        {
+                            'distance_meters': distances[row][column],
+                            'duration_seconds': durations[row][column],
+                        },
+                    )
+    return {
+        'distance_meters': distances,
+        'duration_seconds': durations,
+        'errors': errors,
     }
-    if include_leg_geometry:
-        params['LegGeometryFormat'] = 'FlexiblePolyline'
+
+
+ALONG_ROUTE_FIELDS = ('place_id', 'name', 'address', 'coordinates', 'categories')
+
+
+@mcp.tool()
+@metrics.instrument_tool
+async def search_along_route(
+    #ctx: Context,
+    departure_position: list = Field(description='Departure position as [longitude, latitude]'),
+    destination_position: list = Field(
+        description='Destination position as [longitude, latitude]'
+    ),
+    query: str = Field(
+        description="Place category to look for along the route, e.g. 'gas_station' or 'tourist_attraction'"
+    ),
+    travel_mode: str = Field(
+        default='Car',
+        description="Travel mode: 'Car', 'Truck', 'Pedestrian' or 'Scooter' (default: 'Car')",
+    ),
+    sample_interval_meters: int = Field(
+        default=25000, description='Distance between search points along the route', ge=1000
+    ),
+    search_radius: int = Field(
+        default=5000, description='Search radius around each search point in meters', ge=100, le=50000
+    ),
+    max_results_per_stop: int = Field(
+        default=5, description='Maximum places returned per search point', ge=1, le=50
+    ),
+) -> Dict:
+    """Finds places along the route between two points in a single call.
+
+    Use this tool for questions like "what should I see on the way from A to B" or
+    "where can I refuel on the way". It calculates the route, picks search points
+    along it every sample_interval_meters, searches around all of them at once and
+    returns each place once, ordered by how far along the route it is.
+
+    Input Parameters:
+    - departure_position: Starting point as [longitude, latitude]
+    - destination_position: End point as [longitude, latitude]
+    - query: Place category, lower case with _ for spaces (e.g. "gas_station")
+    - travel_mode: 'Car' (default), 'Truck', 'Pedestrian' or 'Scooter'
+    - sample_interval_meters: Spacing of search points (default 25000); widened
+      automatically on very long routes
+    - search_radius: Radius searched around each point (default 5000)
+    - max_results_per_stop: Places kept per search point (default 5)
+
+    Returns:
+    A dictionary containing:
+    - distance_meters / duration_seconds: Totals for the route
+    - search_points: Number of points searched along the route
+    - places: Places ordered along the route, each with offset_meters (distance from
+      the start along the route) and distance_from_route_meters
+    - error: Error message if the search fails
+
+    Example Usage:
+    search_along_route(
+        departure_position=[-122.3321, 47.6062],
+        destination_position=[-122.6765, 45.5231],
+        query="gas_station"
+    )
+    """
+    max_samples = 40  # Upper bound on concurrent searches per call
+    if geo_routes_client.geo_routes_client is None or geo_places_client.geo_places_client is None:
+        return {'error': 'AWS geo-places or geo-routes client not initialized'}
     try:
-        response = await asyncio.to_thread(client.calculate_routes, **params)
-        if mode == 'raw':
-            return response
-        routes = response.get('Routes', [])
-        if not routes:
-            return {'error': 'No route found'}
-        route = routes[0]
-        distance_meters = route.get('Distance', None)
-        duration_seconds = route.get('DurationSeconds', None)
-        turn_by_turn = []
-        for leg in route.get('Legs', []):
-            vehicle_leg_details = leg.get('VehicleLegDetails', {})
-            for step in vehicle_leg_details.get('TravelSteps', []):
-                step_summary = {
-                    'distance_meters': step.get('Distance'),
-                    'duration_seconds': step.get('Duration'),
-                    'type': step.get('Type'),
-                    'road_name': step.get('NextRoad', {}).get('RoadName')
-                    if step.get('NextRoad')
-                    else None,
-                }
-                turn_by_turn.append(step_summary)
+        route = await _calculate_route(
+            departure_position,
+            destination_position,
+            travel_mode,
+            'FastestRoute',
+            include_leg_geometry=True,
+        )
+        if 'error' in route:
+            return route
+        import numpy as np
+        import route_geometry
+
+        legs = [polyline.decode_array(encoded) for encoded in route['geometry']]
+        if not legs:
+            return {'error': 'Route has no geometry'}
+        points = np.concatenate(legs)
+        cumulative = route_geometry.cumulative_distances(points)
+        samples = route_geometry.sample_indexes(cumulative, sample_interval_meters, max_samples)
+
+        async def search_sample(index):
+            latitude, longitude = float(points[index, 0]), float(points[index, 1])
+            items = place_index.query(query, longitude, latitude, search_radius)
+            if items is None:
+                items = await _search_nearby_items(
+                    longitude, latitude, search_radius, max_results_per_stop, query
+                )
+            return items[:max_results_per_stop]
+
+        results = await asyncio.gather(*(search_sample(index) for index in samples))
+
+        # Keep each place once, at the route point it is closest to
+        found = {}
+        for position, items in enumerate(results):
+            window_start = samples[position - 1] if position > 0 else 0
+            window_end = samples[position + 1] + 1 if position + 1 < len(samples) else len(points)
+            for item in items:
+                place_id = item.get('PlaceId')
+                place_position = item.get('Position')
+                if not place_id or not place_position:
+                    continue
+                nearest = route_geometry.nearest_index(
+                    points, place_position[0], place_position[1], window_start, window_end
+                )
+                distance = haversine_meters(
+                    place_position[0], place_position[1], points[nearest, 1], points[nearest, 0]
+                )
+                if place_id not in found or distance < found[place_id][0]:
+                    found[place_id] = (distance, float(cumulative[nearest]), item)
+
+        places = []
+        for distance, offset, item in sorted(found.values(), key=lambda entry: entry[1]):
+            place = _summarize_nearby_items([item], 'summary', ALONG_ROUTE_FIELDS)[0]
+            place['offset_meters'] = round(offset)
+            place['distance_from_route_meters'] = round(distance)
+            places.append(place)
         return {
-            'distance_meters': distance_meters,
-            'duration_seconds': duration_seconds,
-            'turn_by_turn': turn_by_turn,
+            'distance_meters': route['distance_meters'],
+            'duration_seconds': route['duration_seconds'],
+            'search_points': len(samples),
+            'places': places,
         }
     except Exception as e:
+        logger.error(f'search_along_route error: {e}')
         return {'error': str(e)}
 
 
+# Isolines are cached by origin snapped to the route cache grid, travel mode and time,
+# as decoded polygons ready for containment tests.
+isoline_cache = TTLCache(
+    'calculate_isolines',
+    max_entries=int(os.environ.get('ISOLINE_CACHE_SIZE', '1000')),
+    ttl_seconds=float(os.environ.get('ISOLINE_CACHE_TTL', os.environ.get('ROUTE_CACHE_TTL', '3600'))),
+)
+REACHABLE_CANDIDATES = 50
+
+
+def _isoline_polygons(isoline):
+    """Polygons of an isoline as lists of (n, 2) latitude, longitude ring arrays."""
+    import numpy as np
+
+    polygons = []
+    for geometry in isoline.get('Geometries', []):
+        if geometry.get('PolylinePolygon'):
+            rings = [polyline.decode_array(encoded) for encoded in geometry['PolylinePolygon']]
+        else:
+            rings = [np.asarray(ring, dtype=np.float64)[:, [1, 0]] for ring in geometry.get('Polygon', [])]
+        if rings:
+            polygons.append(rings)
+    return polygons
+
+
+async def _calculate_isoline(longitude, latitude, seconds, travel_mode):
+    """Polygons reachable within seconds of a position, served from the isoline cache."""
+    cache_key = '|'.join(
+        (travel_mode, str(seconds), snap_position([longitude, latitude], ROUTE_CACHE_GRID_DEGREES))
+    )
+    polygons = isoline_cache.get(cache_key)
+    if polygons is not None:
+        logger.debug(f'Isoline cache hit for {cache_key}')
+        return polygons
+    response = await call_aws(
+        'geo-routes',
+        'calculate_isolines',
+        Origin=[longitude, latitude],
+        Thresholds={'Time': [seconds]},
+        TravelMode=travel_mode,
+        IsolineGeometryFormat='FlexiblePolyline',
+    )
+    isolines = response.get('Isolines', [])
+    polygons = _isoline_polygons(isolines[0]) if isolines else []
+    isoline_cache.set(cache_key, polygons)
+    return polygons
+
+
+@mcp.tool()
+@metrics.instrument_tool
+async def search_within_travel_time(
+    longitude: float = Field(description='Longitude of the starting point'),
+    latitude: float = Field(description='Latitude of the starting point'),
+    travel_minutes: int = Field(description='Maximum travel time in minutes', ge=1, le=120),
+    query: Optional[str] = Field(
+        default=None, description="Place category, e.g. 'restaurant' or 'pharmacy'"
+    ),
+    travel_mode: str = Field(
+        default='Car',
+        description="Travel mode: 'Car', 'Truck', 'Pedestrian' or 'Scooter' (default: 'Car')",
+    ),
+    max_results: int = Field(
+        default=10, description='Maximum number of places to return', ge=1, le=50
+    ),
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description='Fields to return per place, same choices as search_nearby. Defaults to '
+        'all but contacts and opening_hours',
+    ),
+) -> Dict:
+    """Finds places that can be reached within a travel time from a point.
+
+    Use this tool for questions like "which restaurants can I reach within 20 minutes
+    of my hotel" instead of calling calculate_route for every candidate. It calculates
+    the area reachable in travel_minutes once (an isoline), searches for places around
+    the starting point and keeps the ones inside that area.
+
+    Input Parameters:
+    - longitude, latitude: Starting point
+    - travel_minutes: Maximum travel time (1 to 120 minutes)
+    - query: Optional place category, lower case with _ for spaces (e.g. "coffee_shop")
+    - travel_mode: 'Car' (default), 'Truck', 'Pedestrian' or 'Scooter'
+    - max_results: Number of places to return (default 10, max 50)
+    - fields: Optional list of fields per place, as for search_nearby
+
+    Returns:
+    A dictionary containing:
+    - places: Reachable places, nearest first
+    - reach_meters: How far the reachable area extends from the starting point
+    - search_radius: Radius searched for candidates, at most 50 km, so for long
+      travel times only the nearer part of the area is covered
+    - checked: Number of candidate places tested
+    - error: Error message if the search fails
+
+    Example Usage:
+    search_within_travel_time(
+        longitude=-122.3321, latitude=47.6062, travel_minutes=20, query="restaurant"
+    )
+    """
+    max_radius = 50000  # Largest search_nearby radius
+    if geo_routes_client.geo_routes_client is None or geo_places_client.geo_places_client is None:
+        return {'error': 'AWS geo-places or geo-routes client not initialized'}
+    fields, error_msg = _check_fields(fields, DEFAULT_PLACE_FIELDS)
+    if error_msg:
+        return {'error': error_msg}
+    try:
+        polygons = await _calculate_isoline(longitude, latitude, travel_minutes * 60, travel_mode)
+        if not polygons:
+            return {'places': [], 'reach_meters': 0, 'search_radius': 0, 'checked': 0}
+        import numpy as np
+        import route_geometry
+
+        reach = max(
+            float(route_geometry.distances_from(rings[0], longitude, latitude).max())
+            for rings in polygons
+        )
+        radius = min(max_radius, max(1, int(np.ceil(reach))))
+        items = place_index.query(query, longitude, latitude, radius)
+        if items is None:
+            items = await _search_nearby_items(
+                longitude, latitude, radius, REACHABLE_CANDIDATES, query
+            )
+        items = [item for item in items if item.get('Position')]
+        positions = np.array([item['Position'] for item in items], dtype=np.float64).reshape(-1, 2)
+        inside = np.zeros(len(items), dtype=bool)
+        for rings in polygons:
+            inside |= route_geometry.points_in_polygon(positions[:, 1], positions[:, 0], rings)
+        reachable = [items[index] for index in np.flatnonzero(inside)]
+        reachable.sort(
+            key=lambda item: haversine_meters(longitude, latitude, *item['Position'][:2])
+        )
+        return {
+            'places': _summarize_nearby_items(
+                reachable[:max_results], 'summary', fields, (longitude, latitude)
+            ),
+            'reach_meters': round(reach),
+            'search_radius': radius,
+            'checked': len(items),
+        }
+    except Exception as e:
+        logger.error(f'search_within_travel_time error: {e}')
+        return {'error': str(e)}
+
+
+def _cache_stats() -> dict:
+    stats = {
+        cache.name: cache.stats()
+        for cache in (
+            reverse_geocode_cache,
+            place_detail_cache,
+            route_cache,
+            route_matrix_cache,
+            isoline_cache,
+        )
+    }
+    stats['search_nearby_place_index'] = place_index.stats()
+    return stats
+
+
+@mcp.resource('location://cache-stats')
+def cache_stats() -> dict:
+    """Entry counts and hit rates of the server's result caches."""
+    return _cache_stats()
+
+
+@mcp.resource('location://stats')
+def server_stats() -> dict:
+    """Server statistics since start, the JSON counterpart of the /metrics route.
+
+    Covers per-tool latency and errors, AWS calls, throttles and errors per API,
+    search_nearby radius expansion depth, the cache statistics, the adaptive
+    concurrency limit of each API and the latency, errors and hedges per region.
+    """
+    return dict(
+        metrics.snapshot(),
+        caches=_cache_stats(),
+        limiters=aws_limiters.stats(),
+        regions=region_router.stats(),
+    )
+
+
+@mcp.custom_route('/metrics', methods=['GET'])
+async def metrics_route(request: Request) -> PlainTextResponse:
+    """Server statistics in the Prometheus text format, served by the HTTP transports."""
+    return PlainTextResponse(
+        metrics.prometheus(_cache_stats(), aws_limiters.stats(), region_router.stats()),
+        media_type='text/plain; version=0.0.4',
+    )
+
+
 def main():
     """Run the MCP server with CLI argument support."""
     mcp.run()
@@ -0,0 +1,216 @@
+"""Adaptive client-side concurrency limits for Amazon Location API calls.
+
+Each API gets an AdaptiveLimiter that caps the calls in flight and adjusts the cap
+with AIMD: every successful call adds 1/limit (about +1 per round of calls), a
+throttled call halves it and a recent mean latency well above the API's baseline
+shrinks it slightly, at most once per round of calls. The cap so settles just
+below the account quota instead of every caller retrying throttled calls in
+lockstep. The baseline is a slow-moving mean rather than the fastest call seen,
+so ordinary jitter does not read as overload.
+
+Calls over the cap wait in a FIFO queue. A call that would not get a slot before
+its deadline is rejected right away with a ThrottlingException, so callers fail
+fast instead of piling up behind a saturated API.
+"""
+
+import asyncio
+import collections
+import threading
+import time
+import botocore.exceptions
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with queued, deadline-aware admission for one API."""
+
+    # Successful calls whose mean latency becomes the first baseline
+    WARMUP_CALLS = 20
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: float = 8.0,
+        min_limit: float = 1.0,
+        max_limit: float = 64.0,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        baseline_window: float = 60.0,
+    ):
+        """Initialize the limiter at initial_limit concurrent calls."""
+        self.name = name
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.baseline_window = baseline_window
+        self.in_flight = 0
+        self._waiters = collections.deque()
+        self._lock = threading.Lock()
+        self._last_decrease = 0.0
+        self.baseline_latency = None
+        self.mean_latency = None
+        self._latency_samples = 0
+        self._baseline_updated = 0.0
+        self.admitted = 0
+        self.rejected = 0
+        self.throttles = 0
+        self.decreases = 0
+        self.abandoned = 0
+
+    def _expected_wait(self):
+        """Rough time until a new caller gets a slot, from the queue and call latency."""
+        if self.mean_latency is None:
+            return 0.0
+        return (len(self._waiters) + 1) * self.mean_latency / max(self.limit, 1.0)
+
+    def _reject(self, operation):
+        self.rejected += 1
+        raise botocore.exceptions.ClientError(
+            {
+                'Error': {
+                    'Code': 'ThrottlingException',
+                    'Message': f'Rejected by the client-side limiter for {self.name}, '
+                    'the call could not start before its deadline',
+                }
+            },
+            operation,
+        )
+
+    async def acquire(self, deadline: float, operation: str = None) -> float:
+        """Wait for a slot, returning its start time; raise ThrottlingException past deadline.
+
+        deadline is a time.monotonic() value.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.in_flight < int(self.limit) and not self._waiters:
+                self.in_flight += 1
+                self.admitted += 1
+                return time.monotonic()
+            if time.monotonic() + self._expected_wait() > deadline:
+                self._reject(operation or self.name)
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                # The slot may have been handed over just as the wait timed out
+                elif waiter.done() and not waiter.cancelled():
+                    self._release_slot()
+                self._reject(operation or self.name)
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    self._release_slot()
+            raise
+        return time.monotonic()
+
+    def _release_slot(self):
+        """Free one slot and hand free slots to queued callers; the caller holds the lock.
+
+        Limiters are used from the event loop thread, so waiters are resolved directly.
+        """
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            self.admitted += 1
+            waiter.set_result(None)
+
+    def _adapt(self, started_at, now, throttled):
+        """Adapt the limit to one finished call; the caller holds the lock."""
+        latency = now - started_at
+        if throttled:
+            self.throttles += 1
+            # Calls started before the last decrease saw the old limit, count them once
+            if started_at >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self._last_decrease = now
+                self.decreases += 1
+        else:
+            self._latency_samples += 1
+            if self.mean_latency is None:
+                self.mean_latency = latency
+            # The recent mean follows the last ten or so calls
+            self.mean_latency += 0.1 * (latency - self.mean_latency)
+            if self._latency_samples <= self.WARMUP_CALLS:
+                self.baseline_latency = self.mean_latency
+            elif self.mean_latency < self.baseline_latency:
+                self.baseline_latency += 0.01 * (self.mean_latency - self.baseline_latency)
+            else:
+                # The baseline rises only over baseline_window seconds, however many
+                # calls, so a service slowing down under load shows as the recent mean
+                # pulling away while a lasting change of latency is absorbed in time
+                rate = min(1.0, (now - self._baseline_updated) / self.baseline_window)
+                self.baseline_latency += rate * (self.mean_latency - self.baseline_latency)
+            self._baseline_updated = now
+            slow = self.mean_latency > self.latency_tolerance * self.baseline_latency
+            if slow and self._latency_samples > self.WARMUP_CALLS:
+                # Once per round of calls, like throttles, so the limit shrinks gradually
+                if started_at >= self._last_decrease:
+                    self.limit = max(self.min_limit, self.limit * 0.95)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def release(self, started_at: float, throttled: bool = False, adapt: bool = True):
+        """Return a slot and adapt the limit to how the call went.
+
+        With adapt False the slot is returned as is, for calls whose caller gave up on
+        them and whose latency says nothing about the API.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if adapt:
+                self._adapt(started_at, now, throttled)
+            else:
+                self.abandoned += 1
+            self._release_slot()
+
+    def stats(self) -> dict:
+        return {
+            'limit': round(self.limit, 2),
+            'in_flight': self.in_flight,
+            'queued': len(self._waiters),
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'throttles': self.throttles,
+            'decreases': self.decreases,
+            'abandoned': self.abandoned,
+            'baseline_latency_ms': round(1000 * self.baseline_latency, 1)
+            if self.baseline_latency is not None
+            else None,
+            'mean_latency_ms': round(1000 * self.mean_latency, 1)
+            if self.mean_latency is not None
+            else None,
+        }
+
+
+class LimiterRegistry:
+    """One AdaptiveLimiter per API, created on first use with shared settings."""
+
+    def __init__(self, **limiter_settings):
+        """Initialize an empty registry; limiter_settings go to every AdaptiveLimiter."""
+        self.limiter_settings = limiter_settings
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> AdaptiveLimiter:
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.setdefault(
+                    name, AdaptiveLimiter(name, **self.limiter_settings)
+                )
+        return limiter
+
+    def stats(self) -> dict:
+        return {name: limiter.stats() for name, limiter in sorted(self._limiters.items())}
@@ -5,8 +5,14 @@ from strands.telemetry.tracer import get_tracer
 from strands.models import BedrockModel
 from strands.tools.mcp import MCPClient
 from mcp.client.sse import sse_client
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, session
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
+from agent_pool import AgentPool, PoolExhausted
+from admission import AdmissionController, Rejected
+from agent_stream import progress, sse
+from response_cache import ResponseCache
+from contextlib import ExitStack
+import sys
 import threading
 import time
 
@@ -19,13 +25,16 @@ tracer = get_tracer(
     otlp_endpoint="http://localhost:4318",
 )
 
+# Stream model output so /ask/stream can forward tokens as they are generated
+BEDROCK_STREAMING = os.environ.get('BEDROCK_STREAMING', 'true').lower() == 'true'
+
 # Configure models
 nova_agent_model = BedrockModel(
     model_id="us.amazon.nova-pro-v1:0",
     temperature=0,
     max_tokens=1000,
     top_p=0.2,
-    streaming=False,
+    streaming=BEDROCK_STREAMING,
 )
 
 claude_agent_model = BedrockModel(
@@ -61,11 +70,26 @@ def load_user(user_id):
     return None
 
 # Global variables
-agent = None
-mcp_client = None
-tools = None
 agent_ready = False
 
+MCP_SSE_URL = "http://localhost:8080/sse"
+
+# Agents kept connected to the MCP server, borrowed by one request at a time
+AGENT_POOL_SIZE = int(os.environ.get('AGENT_POOL_SIZE', '4'))
+AGENT_POOL_TIMEOUT = float(os.environ.get('AGENT_POOL_TIMEOUT', '30'))
+AGENT_POOL_MAX_AGE = float(os.environ.get('AGENT_POOL_MAX_AGE', '900'))
+
+# Queries that may wait for a busy pool, and queries one user may have in flight
+AGENT_QUEUE_SIZE = int(os.environ.get('AGENT_QUEUE_SIZE', '8'))
+USER_MAX_CONCURRENT = int(os.environ.get('USER_MAX_CONCURRENT', '2'))
+
+# Answers cached by normalized query, optionally per user
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', '500'))
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', '600'))
+RESPONSE_CACHE_PER_USER = os.environ.get('RESPONSE_CACHE_PER_USER', 'false').lower() == 'true'
+# Seconds a query waits for an identical query already running
+RESPONSE_CACHE_WAIT = float(os.environ.get('RESPONSE_CACHE_WAIT', '120'))
+
 # System prompt for the travel assistant
 SYSTEM_PROMPT = """You are TravelGuide, an AI travel assistant specialized in creating personalized itineraries and providing comprehensive travel guidance. Your capabilities include:
 
@@ -119,30 +143,88 @@ if you use the search_nearby tool, places should be mapped to one of the followi
     PROCESS :
     When answering any query, first check if you need to calculate a route using the calculate_route tool, once its done, use the route information
     to get any other information that is required.
+    When a trip has several stops, call calculate_route_matrix once with all the stops as origins and destinations
+    to get every leg's distance and duration, and use it to order the stops instead of calling calculate_route for each pair.
+    For places to see, eat or refuel on the way between two points, call search_along_route once with the category
+    instead of guessing positions for search_nearby.
+    To turn several coordinates into addresses, call reverse_geocode_batch once with all of them instead of
+    calling reverse_geocode per point.
+    To find a named place or an address use search_places, and call get_place with its place_id for phone numbers,
+    websites and opening hours.
+    For places that are open now or at a given time, call search_places_open_now (with at='Saturday 21:00' for a
+    future time) instead of reading opening hours yourself.
+    For places reachable within a travel time ("within 20 minutes of my hotel"), call search_within_travel_time
+    once instead of calling calculate_route for each candidate.
     
 """
 
-def initialize_agent():
-    """Initialize the MCP client and agent in a separate thread."""
-    global agent, mcp_client, tools, agent_ready
-    
-    # Connect to an MCP server using SSE transport
-    mcp_client = MCPClient(lambda: sse_client("http://localhost:8080/sse"))
-    
-    # Create an agent with MCP tools
-    with mcp_client:
-        # Get the tools from the MCP server
+def build_agent():
+    """Open an MCP session and build an agent on its tools."""
+    mcp_client = MCPClient(lambda: sse_client(MCP_SSE_URL))
+    mcp_client.start()
+    try:
         tools = mcp_client.list_tools_sync()
-        
-        # Create an agent with these tools
         agent = Agent(
             system_prompt=SYSTEM_PROMPT,
             tools=tools,
-            model=claude_agent_model
+            model=nova_agent_model
         )
-        
-        agent_ready = True
-        print("Agent initialized and ready to use")
+    except Exception:
+        mcp_client.stop(None, None, None)
+        raise
+    return mcp_client, agent
+
+agent_pool = AgentPool(
+    build_agent,
+    size=AGENT_POOL_SIZE,
+    timeout=AGENT_POOL_TIMEOUT,
+    max_age=AGENT_POOL_MAX_AGE,
+)
+
+admission = AdmissionController(
+    max_in_flight=AGENT_POOL_SIZE + AGENT_QUEUE_SIZE,
+    max_per_user=USER_MAX_CONCURRENT,
+)
+
+response_cache = ResponseCache(
+    max_entries=RESPONSE_CACHE_SIZE,
+    ttl_seconds=RESPONSE_CACHE_TTL,
+    per_user=RESPONSE_CACHE_PER_USER,
+)
+
+def rejection(message, status, retry_after):
+    """JSON reply for a query turned away, with a Retry-After hint."""
+    response = jsonify({'response': message, 'metrics': None})
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def result_metrics(result, setup_time):
+    """Metrics of a finished agent run."""
+    return {
+        'total_tokens': result.metrics.accumulated_usage.get('totalTokens', 0),
+        'execution_time': round(sum(result.metrics.cycle_durations), 2),
+        'setup_time': round(setup_time, 3),
+        'tools_used': list(result.metrics.tool_metrics.keys())
+    }
+
+def reply_from(reply, source, **metrics):
+    """A cached or fresh reply, with where it came from added to its metrics."""
+    return dict(reply, metrics=dict(reply['metrics'], cache=source, **metrics))
+
+def initialize_agent():
+    """Connect the pooled agents in a separate thread."""
+    global agent_ready
+    
+    while True:
+        try:
+            agent_pool.fill()
+            break
+        except Exception as e:
+            print(f"Could not connect to the MCP server, retrying: {e}")
+            time.sleep(5)
+    agent_ready = True
+    print(f"{AGENT_POOL_SIZE} agents initialized and ready to use")
 
 # Start agent initialization in a separate thread
 threading.Thread(target=initialize_agent).start()
@@ -194,54 +276,142 @@ def ask_agent():
             'metrics': None
         })
     
-    try:
-        # Create a completely new connection for each request with a unique session ID
-        session_id = f"session_{time.time()}"
-        connection_url = f"http://localhost:8080/sse?session={session_id}"
-        
-        # Create a fresh MCP client with the unique session
-        fresh_mcp_client = MCPClient(lambda: sse_client(connection_url))
-        
-        # Process the query with a fresh agent instance
-        with fresh_mcp_client:
-            # Get the tools from the MCP server
-            fresh_tools = fresh_mcp_client.list_tools_sync()
-            
-            # Create a new agent instance with memory disabled
-            fresh_agent = Agent(
-                system_prompt=SYSTEM_PROMPT,
-                tools=fresh_tools,
-                model=nova_agent_model
-            )
+    cache_key = response_cache.key(user_query, current_user.get_id())
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return jsonify(reply_from(cached, 'hit'))
+    
+    def run_agent():
+        setup_start = time.perf_counter()
+        # Borrow a connected agent; its conversation is reset when it is returned
+        with agent_pool.agent() as pooled_agent:
+            setup_time = time.perf_counter() - setup_start
             
             # Process the query
-            result = fresh_agent(user_query)
+            result = pooled_agent(user_query)
             
-            # Extract metrics
-            metrics = {
-                'total_tokens': result.metrics.accumulated_usage.get('totalTokens', 0),
-                'execution_time': round(sum(result.metrics.cycle_durations), 2),
-                'tools_used': list(result.metrics.tool_metrics.keys())
+            return {
+                'response': str(result),
+                'metrics': result_metrics(result, setup_time)
             }
-            
-            # Extract the response text
-            response_text = str(result)
-            
-            return jsonify({
-                'response': response_text,
-                'metrics': metrics
-            })
+    
+    try:
+        with admission.admit(current_user.get_id()):
+            # Identical queries already running are waited for instead of run again
+            reply, source = response_cache.get_or_compute(cache_key, run_agent, timeout=RESPONSE_CACHE_WAIT)
+        return jsonify(reply_from(reply, source))
+    except Rejected as e:
+        return rejection(str(e), e.status, e.retry_after)
+    except (PoolExhausted, TimeoutError):
+        return rejection('All agents are busy. Please try again in a few moments.', 503, admission.retry_after)
     except Exception as e:
         return jsonify({
             'response': f"Error processing your request: {str(e)}",
             'metrics': None
         })
 
+@app.route('/ask/stream', methods=['POST'])
+@login_required
+def ask_agent_stream():
+    """Process user query and stream the answer and tool calls as server-sent events."""
+    if not agent_ready:
+        return rejection('Agent is still initializing. Please try again in a few moments.', 503, admission.retry_after)
+    
+    user_query = request.json.get('query', '')
+    if not user_query:
+        return jsonify({'response': 'Please provide a query.', 'metrics': None}), 400
+    
+    request_start = time.perf_counter()
+    cache_key = response_cache.key(user_query, current_user.get_id())
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return event_stream(replay(cached, 'hit', request_start))
+    
+    # The admission slot, the run of this query and the agent are held until the stream ends
+    held = ExitStack()
+    pooled_agent = None
+    try:
+        held.enter_context(admission.admit(current_user.get_id()))
+        cached, flight, leader = response_cache.join(cache_key)
+        if leader:
+            held.callback(response_cache.fail, cache_key, flight, RuntimeError('the same query failed, please try again'))
+            pooled_agent = held.enter_context(agent_pool.agent())
+    except Rejected as e:
+        held.close()
+        return rejection(str(e), e.status, e.retry_after)
+    except PoolExhausted:
+        held.close()
+        return rejection('All agents are busy. Please try again in a few moments.', 503, admission.retry_after)
+    except Exception as e:
+        held.close()
+        return jsonify({'response': f"Error processing your request: {str(e)}", 'metrics': None}), 500
+    setup_time = time.perf_counter() - request_start
+    
+    def run_events():
+        if cached is not None:
+            yield from replay(cached, 'hit', request_start)
+            return
+        if not leader:
+            # An identical query is running; share its answer
+            yield from replay(flight.wait(RESPONSE_CACHE_WAIT), 'shared', request_start)
+            return
+        first_token_time = None
+        for event, data in progress(pooled_agent, user_query):
+            if event == 'text' and first_token_time is None:
+                first_token_time = time.perf_counter() - request_start
+            if event == 'result':
+                reply = {
+                    'response': str(data),
+                    'metrics': dict(
+                        result_metrics(data, setup_time),
+                        first_token_time=round(first_token_time, 3) if first_token_time is not None else None
+                    )
+                }
+                response_cache.complete(cache_key, flight, reply)
+                event, data = 'done', {'metrics': reply_from(reply, 'miss')['metrics']}
+            yield sse(event, data)
+    
+    def events():
+        try:
+            yield from run_events()
+        except Exception as e:
+            # A failed agent is discarded by the pool; the client still gets a final event
+            held.__exit__(type(e), e, e.__traceback__)
+            yield sse('error', {'message': f"Error processing your request: {str(e)}"})
+        except BaseException:
+            # The client went away mid-run
+            held.__exit__(*sys.exc_info())
+            raise
+        else:
+            held.close()
+    
+    response = event_stream(events())
+    # Also releases the agent if the stream is closed before it starts
+    response.call_on_close(held.close)
+    return response
+
+def replay(reply, source, request_start):
+    """Server-sent events of a reply that is already complete."""
+    yield sse('text', {'text': reply['response']})
+    first_token_time = round(time.perf_counter() - request_start, 3)
+    yield sse('done', {'metrics': reply_from(reply, source, first_token_time=first_token_time)['metrics']})
+
+def event_stream(events):
+    response = Response(events, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/status')
 @login_required
 def agent_status():
     """Check if the agent is ready."""
-    return jsonify({'ready': agent_ready})
+    return jsonify({
+        'ready': agent_ready,
+        'agent_pool': agent_pool.stats(),
+        'admission': admission.stats(),
+        'response_cache': response_cache.stats()
+    })
 
 @app.route('/health')
 def health_check():
@@ -0,0 +1,22 @@
+"""Gunicorn settings for serving the web app with many agent queries at once.
+
+    gunicorn -c gunicorn.conf.py awsLocationWithMCP_web:app
+
+Each worker process has its own agent pool and admission limits, so a worker
+gets enough threads for every query it admits plus a few for the status polls,
+logins and health checks that must not wait behind agent runs.
+"""
+
+import os
+
+
+bind = os.environ.get('WEB_BIND', '0.0.0.0:8081')
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_WORKERS', '1'))
+threads = (
+    int(os.environ.get('AGENT_POOL_SIZE', '4')) + int(os.environ.get('AGENT_QUEUE_SIZE', '8')) + 4
+)
+# Agent runs take tens of seconds; the gthread worker keeps heartbeating while they do
+timeout = 120
+graceful_timeout = 60
+keepalive = 5
@@ -0,0 +1,171 @@
+"""Response cache for agent queries in the web app, keyed on the normalized query.
+
+Many users ask near-identical questions ("Drive Seattle to Portland, how long?"
+and "drive seattle to portland how long"), and each used to start a full agent
+run with several tool calls. normalize_query() folds case, Unicode forms,
+punctuation and spacing, and answers are cached under the normalized query for
+ttl_seconds, least recently used first out beyond max_entries. With per_user the
+key also holds the user, so users never see each other's answers.
+
+Identical queries that arrive while the first one is still running do not start
+runs of their own: the first caller leads the run and the others wait on its
+Flight and share its answer, or its error.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+# Punctuation, except between digits as in 10:30 or 3.5
+_PUNCTUATION = re.compile(r'(?<!\d)[^\w\s]|[^\w\s](?!\d)')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_query(query: str) -> str:
+    query = unicodedata.normalize('NFKC', query).casefold()
+    return _SPACES.sub(' ', _PUNCTUATION.sub(' ', query)).strip()
+
+
+class Flight:
+    """One agent run that callers with the same query wait on."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self.value = None
+        self.error = None
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def finish(self, value=None, error=None):
+        self.value = value
+        self.error = error
+        self._done.set()
+
+    def wait(self, timeout: float = None):
+        """The leader's answer; raises its error, or TimeoutError if it takes too long."""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f'the same query did not finish within {timeout:g} seconds')
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of agent answers with a time to live and in-flight de-duplication."""
+
+    def __init__(self, max_entries: int = 500, ttl_seconds: float = 600.0, per_user: bool = False):
+        """Initialize an empty cache; max_entries of 0 disables caching but not de-duplication."""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.per_user = per_user
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def key(self, query: str, user_id=None):
+        return (user_id if self.per_user else None, normalize_query(query))
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key):
+        """The cached answer for key, or None."""
+        with self._lock:
+            value = self._get(key)
+            if value is not None:
+                self.hits += 1
+            return value
+
+    def join(self, key):
+        """Cached answer, or the run for key: returns (value, flight, leader).
+
+        The leader must call complete() or fail() with the flight when its run ends;
+        the others call flight.wait().
+        """
+        with self._lock:
+            value = self._get(key)
+            if value is not None:
+                self.hits += 1
+                return value, None, False
+            flight = self._in_flight.get(key)
+            if flight is not None:
+                self.shared += 1
+                return None, flight, False
+            self.misses += 1
+            flight = self._in_flight[key] = Flight()
+            return None, flight, True
+
+    def complete(self, key, flight: Flight, value):
+        """Cache the leader's answer and hand it to the callers waiting on flight."""
+        with self._lock:
+            if self._in_flight.get(key) is flight:
+                del self._in_flight[key]
+            if self.max_entries > 0:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        flight.finish(value=value)
+
+    def fail(self, key, flight: Flight, error: BaseException):
+        """End a run without caching; the callers waiting on flight get error."""
+        with self._lock:
+            if self._in_flight.get(key) is flight:
+                del self._in_flight[key]
+        if not flight.done:
+            flight.finish(error=error)
+
+    def get_or_compute(self, key, compute, timeout: float = None):
+        """Answer for key from the cache, a run already in flight or compute().
+
+        Returns (value, source) with source 'hit', 'shared' or 'miss'.
+        """
+        value, flight, leader = self.join(key)
+        if value is not None:
+            return value, 'hit'
+        if not leader:
+            return flight.wait(timeout), 'shared'
+        try:
+            value = compute()
+        except BaseException as e:
+            self.fail(key, flight, e)
+            raise
+        self.complete(key, flight, value)
+        return value, 'miss'
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.shared
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'per_user': self.per_user,
+                'in_flight': len(self._in_flight),
+                'hits': self.hits,
+                'misses': self.misses,
+                'shared': self.shared,
+                'hit_rate': round((self.hits + self.shared) / lookups, 4) if lookups else 0.0,
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+            }
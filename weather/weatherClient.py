@@ -1,5 +1,8 @@
+import argparse
 import logging
 import asyncio
+import random
+import sys
 from typing import Optional
 from typing import List, Dict, Any
 from contextlib import AsyncExitStack
@@ -9,6 +12,9 @@ from mcp.client.stdio import stdio_client
 from dotenv import load_dotenv
 from mcp.types import Tool
 from fastmcp import Client
+from fastmcp.client.transports import PythonStdioTransport, SSETransport, StreamableHttpTransport
+from fastmcp.exceptions import ToolError
+from urllib.parse import urlparse
 import time
 
 
@@ -204,17 +210,209 @@ class MCPClient:
         logger.info("Cleaning up resources")
         await self.exit_stack.aclose()
 
+TRANSPORTS = ('sse', 'streamable-http', 'stdio')
+DEFAULT_PATHS = {'sse': '/sse', 'streamable-http': '/mcp'}
+
+
+def build_transport(endpoint: str, transport: str):
+    """Build a fastmcp transport for one server replica.
+
+    HTTP endpoints given without a path (e.g. http://localhost:8080) get the
+    default path for the transport appended, stdio endpoints are server scripts.
+    """
+    if transport == 'stdio':
+        return PythonStdioTransport(script_path=endpoint)
+    if urlparse(endpoint).path in ('', '/'):
+        endpoint = endpoint.rstrip('/') + DEFAULT_PATHS[transport]
+    if transport == 'sse':
+        return SSETransport(endpoint)
+    return StreamableHttpTransport(endpoint)
+
+
+class Replica:
+    """A single MCP server replica with a small pool of connected clients."""
+
+    def __init__(self, endpoint: str, transport: str, pool_size: int):
+        self.endpoint = endpoint
+        self.transport = transport
+        self.pool_size = pool_size
+        self.idle: asyncio.Queue = asyncio.Queue()
+        self.connected: List[Client] = []
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    async def connect(self):
+        """Open every pooled connection; raises if the replica is unreachable."""
+        while len(self.connected) < self.pool_size:
+            client = Client(build_transport(self.endpoint, self.transport))
+            await client.__aenter__()
+            self.connected.append(client)
+            self.idle.put_nowait(client)
+
+    async def acquire(self) -> Client:
+        if self.idle.empty() and len(self.connected) < self.pool_size:
+            await self.connect()
+        return await self.idle.get()
+
+    def release(self, client: Client):
+        self.idle.put_nowait(client)
+
+    async def discard(self, client: Client):
+        """Drop a broken connection; it is re-opened on the next acquire."""
+        if client in self.connected:
+            self.connected.remove(client)
+        try:
+            await client.__aexit__(None, None, None)
+        except Exception as e:
+            logger.debug("Error closing connection to %s: %s", self.endpoint, str(e))
+
+    async def close(self):
+        while not self.idle.empty():
+            await self.discard(self.idle.get_nowait())
+        for client in list(self.connected):
+            await self.discard(client)
+
+
+class ReplicaPool:
+    """Load-balanced MCP client over a horizontally scaled set of server replicas.
+
+    Exposes the same ``list_tools``/``call_tool`` coroutines as ``fastmcp.Client``.
+    Each call goes to the healthy replica with the fewest outstanding requests;
+    replicas that fail ``max_failures`` times in a row are ejected for
+    ``ejection_seconds`` (doubling on repeated ejections) and then probed again.
+    Calls that fail on a replica are retried on the next one, which is safe for
+    the read-only weather tools.
+    """
+
+    def __init__(self, endpoints: List[str], transport: str = 'sse',
+                 connections_per_replica: int = 2, max_failures: int = 3,
+                 ejection_seconds: float = 30.0):
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unsupported transport {transport!r}, expected one of {TRANSPORTS}")
+        if not endpoints:
+            raise ValueError("At least one server endpoint is required")
+        self.replicas = [Replica(endpoint, transport, connections_per_replica) for endpoint in endpoints]
+        self.max_failures = max_failures
+        self.ejection_seconds = ejection_seconds
+
+    async def __aenter__(self):
+        for replica in self.replicas:
+            try:
+                await replica.connect()
+                logger.info("Connected to replica %s (%s)", replica.endpoint, replica.transport)
+            except Exception as e:
+                logger.warning("Replica %s unavailable: %s", replica.endpoint, str(e))
+                self._record_failure(replica, eject=True)
+        if not any(replica.connected for replica in self.replicas):
+            raise ConnectionError("No MCP server replica could be reached")
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        for replica in self.replicas:
+            await replica.close()
+
+    async def list_tools(self):
+        return await self._call('list_tools')
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None):
+        return await self._call('call_tool', name, arguments)
+
+    def _pick(self, exclude: set) -> Optional[Replica]:
+        """Least outstanding requests among healthy replicas, random tie-break.
+
+        When every replica is ejected, the one closest to the end of its
+        ejection is probed rather than failing outright.
+        """
+        candidates = [replica for replica in self.replicas if replica not in exclude]
+        if not candidates:
+            return None
+        now = time.monotonic()
+        healthy = [replica for replica in candidates if replica.is_healthy(now)]
+        if not healthy:
+            return min(candidates, key=lambda replica: replica.ejected_until)
+        fewest = min(replica.outstanding for replica in healthy)
+        return random.choice([replica for replica in healthy if replica.outstanding == fewest])
+
+    def _record_failure(self, replica: Replica, eject: bool = False):
+        replica.consecutive_failures += 1
+        if eject or replica.consecutive_failures >= self.max_failures:
+            backoff = self.ejection_seconds * (2 ** min(replica.ejections, 5))
+            replica.ejections += 1
+            replica.ejected_until = time.monotonic() + backoff
+            replica.consecutive_failures = 0
+            logger.warning("Ejecting replica %s for %.0fs", replica.endpoint, backoff)
+
+    async def _call(self, method: str, *args):
+        tried = set()
+        last_error = None
+        while (replica := self._pick(tried)) is not None:
+            tried.add(replica)
+            replica.outstanding += 1
+            client = None
+            handed_back = False
+            try:
+                client = await replica.acquire()
+                result = await getattr(client, method)(*args)
+            except ToolError:
+                # The tool itself failed, the replica is fine
+                replica.release(client)
+                handed_back = True
+                raise
+            except Exception as e:
+                last_error = e
+                logger.warning("Call %s failed on replica %s: %s", method, replica.endpoint, str(e))
+                if client is not None:
+                    handed_back = True
+                    await replica.discard(client)
+                self._record_failure(replica)
+                continue
+            else:
+                replica.release(client)
+                handed_back = True
+            finally:
+                replica.outstanding -= 1
+                if client is not None and not handed_back:
+                    # Cancelled mid-call, the session may be left mid-request; drop it so
+                    # the next acquire opens a replacement instead of the pool running dry
+                    await replica.discard(client)
+            replica.consecutive_failures = 0
+            replica.ejections = 0
+            replica.ejected_until = 0.0
+            return result
+        raise ConnectionError(f"All MCP server replicas failed, last error: {last_error}")
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Weather MCP client")
+    parser.add_argument('endpoints', nargs='*', default=['http://localhost:8080'],
+                        help="Server replica URLs, or server script paths with --transport stdio")
+    parser.add_argument('--transport', choices=TRANSPORTS, default='sse')
+    parser.add_argument('--connections-per-replica', type=int, default=2)
+    parser.add_argument('--max-failures', type=int, default=3,
+                        help="Consecutive failures before a replica is ejected")
+    parser.add_argument('--ejection-seconds', type=float, default=30.0)
+    return parser.parse_args(argv)
+
+
 async def main():
-    if len(sys.argv) < 2:
-        logger.error("Usage: python client.py <path_to_server_script>")
-        sys.exit(1)
+    args = parse_args(sys.argv[1:])
 
     mcp_client = MCPClient()
-    client = Client("http://localhost:8080/sse")
+    client = ReplicaPool(
+        args.endpoints,
+        transport=args.transport,
+        connections_per_replica=args.connections_per_replica,
+        max_failures=args.max_failures,
+        ejection_seconds=args.ejection_seconds,
+    )
 
     async with client:
         await mcp_client.chat_loop(client)
 
 if __name__ == "__main__":
-    import sys
     asyncio.run(main())